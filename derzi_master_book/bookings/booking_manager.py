@@ -1,15 +1,71 @@
-from .models import Appointment
+from .models import Appointment, _VALID_APPOINTMENT_TYPES, _invalid_appointment_type
+from .interval_tree import IntervalTree
+from derzi_master_book.ids import id_key, new_uuids, normalize_id, to_uuid
+from derzi_master_book.indexes import add_in_creation_order
+from collections import defaultdict
+from itertools import count
 from datetime import datetime
-import uuid
 
-appointments_db = []
+appointments_db = {} # appointment_id -> Appointment
+appointments_by_client = defaultdict(dict) # key -> {appointment_id: Appointment}, insertion ordered
+appointments_by_order = defaultdict(dict) # key -> {appointment_id: Appointment}, insertion ordered
+_creation_order = {} # appointment_id -> position in creation order, to keep the index buckets in that order
+_creation_counter = count()
+
+# Below this many appointments a plain scan beats building the interval tree.
+RANGE_INDEX_MIN_SIZE = 64
+# Range queries in a row, with no change in between, before the interval tree is built.
+# Until then queries scan, so alternating changes and queries never pay for a rebuild.
+RANGE_INDEX_CLEAN_QUERIES = 4
+_range_index = None # (IntervalTree of snapshot positions, snapshot of appointments_db) or None
+_clean_range_queries = 0 # Range queries since appointments_db last changed
+
+def _unindex(index, key, appointment):
+    """
+    Removes an appointment from one bucket of a foreign-key index, dropping empty buckets.
+    """
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(appointment.appointment_id, None)
+        if not bucket:
+            del index[key]
+
+def _add_to_bucket(bucket, appointment):
+    """
+    Adds an appointment to one bucket of a foreign-key index, keeping the bucket in creation order.
+    """
+    add_in_creation_order(bucket, appointment.appointment_id, appointment, _creation_order)
+
+def _invalidate_range_index():
+    """
+    Drops the interval tree; range queries scan until enough clean queries rebuild it.
+    """
+    global _range_index, _clean_range_queries
+    _range_index = None
+    _clean_range_queries = 0
+
+def clear_appointments():
+    """
+    Empties appointments_db and every index built on top of it.
+    """
+    _invalidate_range_index()
+    appointments_db.clear()
+    appointments_by_client.clear()
+    appointments_by_order.clear()
+    _creation_order.clear()
 
 def add_appointment(start_time, end_time, title, client_id=None, order_id=None, 
-                    description=None, location=None, appointment_type=Appointment.TYPE_GENERAL_TASK):
+                    description=None, location=None, appointment_type=Appointment.TYPE_GENERAL_TASK,
+                    appointment_id=None):
     """
     Creates a new Appointment instance and adds it to the in-memory database.
     Validates that end_time is after start_time.
+    A new appointment_id is generated unless one is supplied; supplied ids must not already exist.
     """
+    if appointment_id is not None:
+        appointment_id = to_uuid(appointment_id) # Check and store under the same uuid.UUID key the lookups use
+        if appointment_id in appointments_db:
+            raise ValueError(f"Appointment with ID {appointment_id} already exists.")
     # Model already validates start_time, end_time and appointment_type
     new_appointment = Appointment(
         start_time=start_time,
@@ -19,121 +75,171 @@ def add_appointment(start_time, end_time, title, client_id=None, order_id=None,
         order_id=order_id,
         description=description,
         location=location,
-        appointment_type=appointment_type
+        appointment_type=appointment_type,
+        appointment_id=appointment_id
     )
-    appointments_db.append(new_appointment)
+    appointments_db[new_appointment.appointment_id] = new_appointment
+    _creation_order[new_appointment.appointment_id] = next(_creation_counter)
+    appointments_by_client[id_key(new_appointment.client_id)][new_appointment.appointment_id] = new_appointment
+    appointments_by_order[id_key(new_appointment.order_id)][new_appointment.appointment_id] = new_appointment
+    _invalidate_range_index()
     return new_appointment
 
+def bulk_add_appointments(rows):
+    """
+    Adds one appointment per dict of add_appointment keyword arguments and returns them in order.
+    Ids for the batch are generated together. If a row fails validation, the rows before it stay added.
+    """
+    return [
+        add_appointment(**{"appointment_id": appointment_id, **row})
+        for row, appointment_id in zip(rows, new_uuids(len(rows)))
+    ]
+
 def get_appointment_by_id(appointment_id):
     """
-    Searches appointments_db for an appointment with the given appointment_id.
+    Looks up an appointment by its appointment_id in appointments_db.
     Returns the appointment object if found, otherwise None.
     """
     try:
-        uuid_obj = uuid.UUID(str(appointment_id))
+        uuid_obj = to_uuid(appointment_id)
     except ValueError:
         return None # Not a valid UUID format
-        
-    for appointment in appointments_db:
-        if appointment.appointment_id == uuid_obj:
-            return appointment
-    return None
+
+    return appointments_db.get(uuid_obj)
 
 def list_appointments_for_client(client_id):
     """
     Returns a list of all appointments for a given client_id.
     """
-    # Assuming client_id is a UUID or a string that can be directly compared
-    client_appointments = []
-    for appointment in appointments_db:
-        if str(appointment.client_id) == str(client_id): # Compare as strings for safety
-            client_appointments.append(appointment)
-    return client_appointments
+    return list(appointments_by_client.get(id_key(client_id), {}).values())
 
 def list_appointments_for_order(order_id):
     """
     Returns a list of all appointments related to a given order_id.
     """
-    # Assuming order_id is a UUID or a string that can be directly compared
-    order_appointments = []
-    for appointment in appointments_db:
-        if str(appointment.order_id) == str(order_id): # Compare as strings for safety
-            order_appointments.append(appointment)
-    return order_appointments
+    return list(appointments_by_order.get(id_key(order_id), {}).values())
 
 def list_appointments_in_range(range_start_time, range_end_time):
     """
     Returns a list of all appointments that fall within or overlap with the given time range.
     An appointment overlaps if its start_time is before range_end_time AND its end_time is after range_start_time.
+    Results are in insertion order. Large databases that have not changed for a few queries
+    are answered from an interval tree in O(log N + K log K).
     """
+    global _range_index, _clean_range_queries
     if not isinstance(range_start_time, datetime) or not isinstance(range_end_time, datetime):
         raise ValueError("range_start_time and range_end_time must be datetime objects.")
     if range_end_time <= range_start_time:
         raise ValueError("range_end_time must be after range_start_time.")
 
-    overlapping_appointments = []
-    for appointment in appointments_db:
-        # Check for overlap:
-        # (ApptStart < RangeEnd) and (ApptEnd > RangeStart)
-        if appointment.start_time < range_end_time and appointment.end_time > range_start_time:
-            overlapping_appointments.append(appointment)
-    return overlapping_appointments
+    if _range_index is None and len(appointments_db) >= RANGE_INDEX_MIN_SIZE:
+        _clean_range_queries += 1
+        if _clean_range_queries >= RANGE_INDEX_CLEAN_QUERIES:
+            snapshot = list(appointments_db.values())
+            _range_index = (
+                IntervalTree((appointment.start_time, appointment.end_time, position)
+                             for position, appointment in enumerate(snapshot)),
+                snapshot,
+            )
+    if _range_index is not None:
+        tree, snapshot = _range_index
+        # The tree stores snapshot positions, so sorting them restores insertion order
+        return [snapshot[position] for position in sorted(tree.overlapping(range_start_time, range_end_time))]
+
+    # Check for overlap:
+    # (ApptStart < RangeEnd) and (ApptEnd > RangeStart)
+    return [
+        appointment for appointment in appointments_db.values()
+        if appointment.start_time < range_end_time and appointment.end_time > range_start_time
+    ]
 
 def list_all_appointments():
     """
-    Returns the appointments_db list.
+    Returns a list of all appointments, in insertion order.
     """
-    return appointments_db
+    return list(appointments_db.values())
+
+def _set_start_time(appointment, start_time):
+    appointment.start_time = start_time
+    _invalidate_range_index()
+
+def _set_end_time(appointment, end_time):
+    appointment.end_time = end_time
+    _invalidate_range_index()
+
+def _set_title(appointment, title):
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("Title must be a non-empty string.")
+    appointment.title = title
+
+def _set_client_id(appointment, client_id):
+    old_key = id_key(appointment.client_id)
+    appointment.client_id = normalize_id(client_id)
+    if id_key(appointment.client_id) != old_key:
+        _unindex(appointments_by_client, old_key, appointment)
+        _add_to_bucket(appointments_by_client[id_key(appointment.client_id)], appointment)
+
+def _set_order_id(appointment, order_id):
+    old_key = id_key(appointment.order_id)
+    appointment.order_id = normalize_id(order_id)
+    if id_key(appointment.order_id) != old_key:
+        _unindex(appointments_by_order, old_key, appointment)
+        _add_to_bucket(appointments_by_order[id_key(appointment.order_id)], appointment)
+
+def _set_description(appointment, description):
+    appointment.description = description
+
+def _set_location(appointment, location):
+    appointment.location = location
+
+def _set_appointment_type(appointment, appointment_type):
+    if not isinstance(appointment_type, str) or appointment_type not in _VALID_APPOINTMENT_TYPES:
+        raise _invalid_appointment_type(appointment_type)
+    appointment.appointment_type = appointment_type
 
-def update_appointment(appointment_id, start_time=None, end_time=None, title=None, 
-                       client_id=None, order_id=None, description=None, location=None, 
-                       appointment_type=None):
+_APPOINTMENT_SETTERS = {
+    "start_time": _set_start_time,
+    "end_time": _set_end_time,
+    "title": _set_title,
+    "client_id": _set_client_id,
+    "order_id": _set_order_id,
+    "description": _set_description,
+    "location": _set_location,
+    "appointment_type": _set_appointment_type,
+}
+
+def update_appointment(appointment_id, **updates):
     """
     Finds the appointment by appointment_id.
-    If found, updates the specified attributes. Ensures end_time remains after start_time if either is updated.
+    If found, updates the attributes given as keyword arguments (start_time, end_time, title,
+    client_id, order_id, description, location, appointment_type); None values are ignored.
+    Ensures end_time remains after start_time if either is updated.
     Return the updated appointment object or None if not found.
     """
+    for field in updates:
+        if field not in _APPOINTMENT_SETTERS:
+            raise TypeError(f"update_appointment() got an unexpected keyword argument '{field}'")
+
     appointment_to_update = get_appointment_by_id(appointment_id)
     if not appointment_to_update:
         return None
 
-    current_start = appointment_to_update.start_time
-    current_end = appointment_to_update.end_time
-
-    if start_time is not None:
-        if not isinstance(start_time, datetime):
+    start_time = updates.get("start_time")
+    end_time = updates.get("end_time")
+    if start_time is not None or end_time is not None:
+        if start_time is not None and not isinstance(start_time, datetime):
             raise ValueError("start_time must be a datetime object.")
-        current_start = start_time
-    
-    if end_time is not None:
-        if not isinstance(end_time, datetime):
+        if end_time is not None and not isinstance(end_time, datetime):
             raise ValueError("end_time must be a datetime object.")
-        current_end = end_time
-
-    if current_end <= current_start:
-        raise ValueError("end_time must be after start_time.")
-
-    if start_time is not None:
-        appointment_to_update.start_time = start_time
-    if end_time is not None:
-        appointment_to_update.end_time = end_time
-    if title is not None:
-        if not isinstance(title, str) or not title.strip():
-            raise ValueError("Title must be a non-empty string.")
-        appointment_to_update.title = title
-    if client_id is not None: # Allows setting client_id to None or a new value
-        appointment_to_update.client_id = client_id
-    if order_id is not None: # Allows setting order_id to None or a new value
-        appointment_to_update.order_id = order_id
-    if description is not None: # Allows setting description to None or a new value
-        appointment_to_update.description = description
-    if location is not None: # Allows setting location to None or a new value
-        appointment_to_update.location = location
-    if appointment_type is not None:
-        if appointment_type not in Appointment.VALID_APPOINTMENT_TYPES:
-            raise ValueError(f"Invalid appointment_type: {appointment_type}. Must be one of {Appointment.VALID_APPOINTMENT_TYPES}")
-        appointment_to_update.appointment_type = appointment_type
-        
+        current_start = appointment_to_update.start_time if start_time is None else start_time
+        current_end = appointment_to_update.end_time if end_time is None else end_time
+        if current_end <= current_start:
+            raise ValueError("end_time must be after start_time.")
+
+    for field, value in updates.items():
+        if value is not None:
+            _APPOINTMENT_SETTERS[field](appointment_to_update, value)
+
     return appointment_to_update
 
 def delete_appointment(appointment_id):
@@ -141,8 +247,16 @@ def delete_appointment(appointment_id):
     Finds and removes the appointment by appointment_id from appointments_db.
     Returns True if deletion was successful, False otherwise.
     """
-    appointment_to_delete = get_appointment_by_id(appointment_id)
+    try:
+        uuid_obj = to_uuid(appointment_id)
+    except ValueError:
+        return False
+
+    appointment_to_delete = appointments_db.pop(uuid_obj, None)
     if appointment_to_delete:
-        appointments_db.remove(appointment_to_delete)
+        _unindex(appointments_by_client, id_key(appointment_to_delete.client_id), appointment_to_delete)
+        _unindex(appointments_by_order, id_key(appointment_to_delete.order_id), appointment_to_delete)
+        del _creation_order[appointment_to_delete.appointment_id]
+        _invalidate_range_index()
         return True
     return False
@@ -0,0 +1,90 @@
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+_start = itemgetter(0)
+_end = itemgetter(1)
+
+class _Node:
+    def __init__(self, center, intervals, left, right):
+        # intervals all contain center. They are kept twice as parallel key/value
+        # lists so that queries can bisect the keys and slice the values.
+        by_start = sorted(intervals, key=_start)
+        by_end = sorted(intervals, key=_end)
+        self.center = center
+        self.starts = [interval[0] for interval in by_start]
+        self.values_by_start = [interval[2] for interval in by_start]
+        self.ends = [interval[1] for interval in by_end]
+        self.values_by_end = [interval[2] for interval in by_end]
+        self.left = left
+        self.right = right
+        # Bounds of every interval in this subtree, so queries can skip it wholesale.
+        # Right subtrees start after center and left subtrees end before it, so only
+        # one child can extend each bound.
+        self.min_start = self.starts[0] if left is None else min(self.starts[0], left.min_start)
+        self.max_end = self.ends[-1] if right is None else max(self.ends[-1], right.max_end)
+
+class IntervalTree:
+    """
+    Centered interval tree (Edelsbrunner) over half-open [start, end) intervals.
+    The tree is static: it is built once from a snapshot of intervals and answers
+    overlap queries in O(log N + K). Callers rebuild it when the intervals change.
+    """
+
+    def __init__(self, intervals):
+        """
+        intervals is an iterable of (start, end, value) tuples with start < end.
+        """
+        intervals = list(intervals)
+        self._size = len(intervals)
+        self._root = self._build(intervals)
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def _build(cls, intervals):
+        if not intervals:
+            return None
+
+        starts = sorted(map(_start, intervals))
+        center = starts[len(starts) // 2]
+
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] <= center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval) # start <= center < end
+
+        # The interval(s) starting at center always land in `here`, so both halves shrink.
+        return _Node(center, here, cls._build(left), cls._build(right))
+
+    def overlapping(self, range_start, range_end):
+        """
+        Returns the values of all intervals with start < range_end and end > range_start,
+        in no particular order.
+        """
+        results = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.min_start >= range_end or node.max_end <= range_start:
+                continue
+            if range_end <= node.center:
+                # Every interval here ends after center >= range_end > range_start,
+                # so the matches are exactly those starting before range_end.
+                results.extend(node.values_by_start[:bisect_left(node.starts, range_end)])
+                stack.append(node.left)
+            elif range_start >= node.center:
+                # Every interval here starts at or before center <= range_start < range_end,
+                # so the matches are exactly those ending after range_start.
+                results.extend(node.values_by_end[bisect_right(node.ends, range_start):])
+                stack.append(node.right)
+            else:
+                # range_start < center < range_end: every interval here overlaps.
+                results.extend(node.values_by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return results
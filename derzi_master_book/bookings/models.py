@@ -1,5 +1,7 @@
 import uuid
 from datetime import datetime
+from derzi_master_book.clock import coarse_now
+from derzi_master_book.ids import normalize_id
 
 class Appointment:
     # Appointment type constants
@@ -9,10 +11,13 @@ class Appointment:
     TYPE_PICKUP = "Pickup"
     TYPE_GENERAL_TASK = "General Task"
     
-    VALID_APPOINTMENT_TYPES = [
+    VALID_APPOINTMENT_TYPES = frozenset([
         TYPE_CONSULTATION, TYPE_MEASUREMENT, TYPE_FITTING, 
         TYPE_PICKUP, TYPE_GENERAL_TASK
-    ]
+    ])
+
+    __slots__ = ('appointment_id', 'client_id', 'order_id', 'start_time', 'end_time', 'title',
+                 'description', 'location', 'created_at', 'appointment_type')
 
     def __init__(self, start_time, end_time, title, client_id=None, order_id=None, 
                  description=None, location=None, appointment_type=TYPE_GENERAL_TASK, 
@@ -22,19 +27,37 @@ class Appointment:
             raise ValueError("start_time and end_time must be datetime objects.")
         if end_time <= start_time:
             raise ValueError("end_time must be after start_time.")
-        if appointment_type not in self.VALID_APPOINTMENT_TYPES:
-            raise ValueError(f"Invalid appointment_type: {appointment_type}. Must be one of {self.VALID_APPOINTMENT_TYPES}")
+        # Unhashable values would make the frozenset membership test raise TypeError
+        if not isinstance(appointment_type, str) or appointment_type not in _VALID_APPOINTMENT_TYPES:
+            raise _invalid_appointment_type(appointment_type)
 
         self.appointment_id = appointment_id if appointment_id is not None else uuid.uuid4()
-        self.client_id = client_id
-        self.order_id = order_id
+        self.client_id = normalize_id(client_id)
+        self.order_id = normalize_id(order_id)
         self.start_time = start_time
         self.end_time = end_time
         self.title = title
         self.description = description
         self.location = location
-        self.created_at = created_at if created_at is not None else datetime.now()
+        self.created_at = created_at if created_at is not None else coarse_now()
         self.appointment_type = appointment_type
 
     def __repr__(self):
         return f"<Appointment {self.appointment_id} - {self.title} ({self.start_time} to {self.end_time})>"
+
+    def __eq__(self, other):
+        if not isinstance(other, Appointment):
+            return NotImplemented
+        return self.appointment_id == other.appointment_id
+
+    def __hash__(self):
+        return hash(self.appointment_id)
+
+_VALID_APPOINTMENT_TYPES = Appointment.VALID_APPOINTMENT_TYPES
+
+def _invalid_appointment_type(appointment_type):
+    """
+    Builds the ValueError for an unknown appointment_type. Only called on the error path,
+    so the valid case never formats the message.
+    """
+    return ValueError(f"Invalid appointment_type: {appointment_type}. Must be one of {sorted(_VALID_APPOINTMENT_TYPES)}")
@@ -1,50 +1,74 @@
 from .models import Client
+from derzi_master_book.ids import new_uuids, to_uuid
 
-clients_db = []
+clients_db = {} # client_id -> Client
 
-def add_client(name, phone_number, email=None, address=None):
+def clear_clients():
+    """
+    Empties clients_db.
+    """
+    clients_db.clear()
+
+def add_client(name, phone_number, email=None, address=None, client_id=None):
     """
     Creates a new Client instance and adds it to the in-memory database.
+    A new client_id is generated unless one is supplied; supplied ids must not already exist.
     """
-    new_client = Client(name=name, phone_number=phone_number, email=email, address=address)
-    clients_db.append(new_client)
+    if client_id is not None:
+        client_id = to_uuid(client_id) # Check and store under the same uuid.UUID key the lookups use
+        if client_id in clients_db:
+            raise ValueError(f"Client with ID {client_id} already exists.")
+    new_client = Client(name=name, phone_number=phone_number, email=email, address=address, client_id=client_id)
+    clients_db[new_client.client_id] = new_client
     return new_client
 
+def bulk_add_clients(rows):
+    """
+    Adds one client per dict of add_client keyword arguments and returns them in order.
+    Ids for the batch are generated together. If a row fails validation, the rows before it stay added.
+    """
+    return [
+        add_client(**{"client_id": client_id, **row})
+        for row, client_id in zip(rows, new_uuids(len(rows)))
+    ]
+
 def get_client_by_id(client_id):
     """
-    Searches for a client by their client_id in the in-memory database.
+    Looks up a client by their client_id in the in-memory database.
     """
-    for client in clients_db:
-        if client.client_id == client_id:
-            return client
-    return None
+    return clients_db.get(client_id)
 
 def list_all_clients():
     """
     Returns the list of all clients in the in-memory database.
     """
-    return clients_db
+    return list(clients_db.values())
+
+def _attribute_setter(attribute):
+    def setter(client, value):
+        setattr(client, attribute, value)
+    return setter
+
+_CLIENT_SETTERS = {
+    field: _attribute_setter(field) for field in ("name", "phone_number", "email", "address")
+}
 
-def update_client(client_id, name=None, phone_number=None, email=None, address=None):
+def update_client(client_id, **updates):
     """
     Updates a client's information in the in-memory database.
-    Only updates attributes for which a new value is provided.
+    Accepts name, phone_number, email and address as keyword arguments and
+    only updates attributes for which a new (non-None) value is provided.
     """
-    client_to_update = None
-    for client in clients_db:
-        if client.client_id == client_id:
-            client_to_update = client
-            break
-    
+    for field in updates:
+        if field not in _CLIENT_SETTERS:
+            raise TypeError(f"update_client() got an unexpected keyword argument '{field}'")
+
+    client_to_update = get_client_by_id(client_id)
+
     if client_to_update:
-        if name is not None:
-            client_to_update.name = name
-        if phone_number is not None:
-            client_to_update.phone_number = phone_number
-        if email is not None:
-            client_to_update.email = email
-        if address is not None:
-            client_to_update.address = address
+        for field, value in updates.items():
+            if value is not None:
+                _CLIENT_SETTERS[field](client_to_update, value)
         return client_to_update
     return None
 
@@ -52,13 +76,8 @@ def delete_client(client_id):
     """
     Deletes a client from the in-memory database by their client_id.
     """
-    client_to_delete = None
-    for client in clients_db:
-        if client.client_id == client_id:
-            client_to_delete = client
-            break
-            
+    client_to_delete = clients_db.pop(client_id, None)
+
     if client_to_delete:
-        clients_db.remove(client_to_delete)
         return True
     return False
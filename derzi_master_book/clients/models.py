@@ -1,14 +1,24 @@
 import uuid
-from datetime import datetime
+from derzi_master_book.clock import coarse_now
 
 class Client:
+    __slots__ = ('client_id', 'name', 'phone_number', 'email', 'address', 'creation_date')
+
     def __init__(self, name, phone_number, email=None, address=None, client_id=None, creation_date=None):
         self.client_id = client_id if client_id is not None else uuid.uuid4()
         self.name = name
         self.phone_number = phone_number
         self.email = email
         self.address = address
-        self.creation_date = creation_date if creation_date is not None else datetime.now()
+        self.creation_date = creation_date if creation_date is not None else coarse_now()
 
     def __repr__(self):
         return f"<Client {self.client_id} - {self.name}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, Client):
+            return NotImplemented
+        return self.client_id == other.client_id
+
+    def __hash__(self):
+        return hash(self.client_id)
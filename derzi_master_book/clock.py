@@ -0,0 +1,18 @@
+import time
+from datetime import datetime
+
+_last_time = 0.0
+_last_now = None
+
+def coarse_now():
+    """
+    Returns the local time like datetime.now(), but at millisecond granularity:
+    calls within the same millisecond share one datetime object. Used for record
+    creation timestamps, where back-to-back inserts would otherwise each build one.
+    """
+    global _last_time, _last_now
+    t = time.time()
+    if _last_now is None or not 0 <= t - _last_time < 0.001:
+        _last_time = t
+        _last_now = datetime.fromtimestamp(t)
+    return _last_now
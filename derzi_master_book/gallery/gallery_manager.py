@@ -1,14 +1,74 @@
 from .models import PortfolioItem
+from derzi_master_book.ids import id_key, new_uuids, normalize_id, to_uuid
+from derzi_master_book.indexes import add_in_creation_order
+from collections import defaultdict
+from itertools import count
 from datetime import date # Changed from datetime to date, as model uses date
-import uuid
 
-portfolio_items_db = []
+portfolio_items_db = {} # item_id -> PortfolioItem
+portfolio_items_by_client = defaultdict(dict) # key -> {item_id: PortfolioItem}, insertion ordered
+portfolio_items_by_order = defaultdict(dict) # key -> {item_id: PortfolioItem}, insertion ordered
+portfolio_items_by_tag = defaultdict(dict) # tag -> {item_id: item}, insertion ordered
+public_portfolio_items = {} # item_id -> item for items with is_public set
+_creation_order = {} # item_id -> position in creation order, to keep the index buckets in that order
+_creation_counter = count()
+
+def _unindex(index, key, item):
+    """
+    Removes an item from one bucket of an index, dropping empty buckets.
+    """
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(item.item_id, None)
+        if not bucket:
+            del index[key]
+
+def _add_to_bucket(bucket, item):
+    """
+    Adds an item to one bucket of an index, keeping the bucket in creation order.
+    """
+    add_in_creation_order(bucket, item.item_id, item, _creation_order)
+
+def _index_tags(item, tags):
+    """
+    Adds an item to the tag index under each of the given (string) tags.
+    """
+    for tag in tags:
+        if isinstance(tag, str):
+            _add_to_bucket(portfolio_items_by_tag[tag], item)
+
+def _unindex_tags(item, tags):
+    """
+    Removes an item from the tag index under each of the given tags, dropping empty tags.
+    """
+    for tag in tags:
+        bucket = portfolio_items_by_tag.get(tag) if isinstance(tag, str) else None
+        if bucket is not None:
+            bucket.pop(item.item_id, None)
+            if not bucket:
+                del portfolio_items_by_tag[tag]
+
+def clear_portfolio_items():
+    """
+    Empties portfolio_items_db and every index built on top of it.
+    """
+    portfolio_items_db.clear()
+    portfolio_items_by_client.clear()
+    portfolio_items_by_order.clear()
+    portfolio_items_by_tag.clear()
+    public_portfolio_items.clear()
+    _creation_order.clear()
 
 def add_portfolio_item(image_path, title=None, description=None, client_id=None, 
-                       order_id=None, style_tags=None, is_public=False):
+                       order_id=None, style_tags=None, is_public=False, item_id=None):
     """
     Creates a new PortfolioItem instance and adds it to the in-memory database.
+    A new item_id is generated unless one is supplied; supplied ids must not already exist.
     """
+    if item_id is not None:
+        item_id = to_uuid(item_id) # Check and store under the same uuid.UUID key the lookups use
+        if item_id in portfolio_items_db:
+            raise ValueError(f"Portfolio item with ID {item_id} already exists.")
     # Model's __init__ handles image_path validation and default values.
     new_item = PortfolioItem(
         image_path=image_path,
@@ -17,46 +77,50 @@ def add_portfolio_item(image_path, title=None, description=None, client_id=None,
         client_id=client_id,
         order_id=order_id,
         style_tags=style_tags,
-        is_public=is_public
+        is_public=is_public,
+        item_id=item_id
     )
-    portfolio_items_db.append(new_item)
+    portfolio_items_db[new_item.item_id] = new_item
+    _creation_order[new_item.item_id] = next(_creation_counter)
+    portfolio_items_by_client[id_key(new_item.client_id)][new_item.item_id] = new_item
+    portfolio_items_by_order[id_key(new_item.order_id)][new_item.item_id] = new_item
+    _index_tags(new_item, new_item.style_tags)
+    if new_item.is_public:
+        public_portfolio_items[new_item.item_id] = new_item
     return new_item
 
+def bulk_add_portfolio_items(rows):
+    """
+    Adds one portfolio item per dict of add_portfolio_item keyword arguments and returns them in order.
+    Ids for the batch are generated together. If a row fails validation, the rows before it stay added.
+    """
+    return [
+        add_portfolio_item(**{"item_id": item_id, **row})
+        for row, item_id in zip(rows, new_uuids(len(rows)))
+    ]
+
 def get_portfolio_item_by_id(item_id):
     """
     Searches for a portfolio item by its item_id in the in-memory database.
     """
     try:
-        uuid_obj = uuid.UUID(str(item_id))
+        uuid_obj = to_uuid(item_id)
     except ValueError:
         return None # Not a valid UUID format
-        
-    for item in portfolio_items_db:
-        if item.item_id == uuid_obj:
-            return item
-    return None
+
+    return portfolio_items_db.get(uuid_obj)
 
 def get_portfolio_items_for_client(client_id):
     """
     Filters items by client_id.
     """
-    # Assuming client_id is a UUID or a string that can be directly compared
-    client_items = []
-    for item in portfolio_items_db:
-        if str(item.client_id) == str(client_id): # Compare as strings for safety
-            client_items.append(item)
-    return client_items
+    return list(portfolio_items_by_client.get(id_key(client_id), {}).values())
 
 def get_portfolio_items_for_order(order_id):
     """
     Filters items by order_id.
     """
-    # Assuming order_id is a UUID or a string that can be directly compared
-    order_items = []
-    for item in portfolio_items_db:
-        if str(item.order_id) == str(order_id): # Compare as strings for safety
-            order_items.append(item)
-    return order_items
+    return list(portfolio_items_by_order.get(id_key(order_id), {}).values())
 
 def get_portfolio_items_by_tag(tag):
     """
@@ -66,59 +130,102 @@ def get_portfolio_items_by_tag(tag):
     if not isinstance(tag, str):
         # Or raise ValueError, depending on desired strictness
         return [] 
-        
-    tagged_items = []
-    for item in portfolio_items_db:
-        if item.style_tags and tag in item.style_tags:
-            tagged_items.append(item)
-    return tagged_items
+
+    return list(portfolio_items_by_tag.get(tag, {}).values())
 
 def list_all_portfolio_items():
     """
     Lists all items in the portfolio_items_db.
     """
-    return portfolio_items_db
+    return list(portfolio_items_db.values())
 
 def list_public_portfolio_items():
     """
     Lists items where is_public is True.
     """
-    public_items = []
-    for item in portfolio_items_db:
-        if item.is_public:
-            public_items.append(item)
-    return public_items
+    return list(public_portfolio_items.values())
+
+def list_public_portfolio_items_for_client(client_id):
+    """
+    Lists a client's items where is_public is True, walking whichever of the
+    client bucket and the public index is smaller.
+    """
+    client_items = portfolio_items_by_client.get(id_key(client_id), {})
+    if len(client_items) <= len(public_portfolio_items):
+        return [item for item_id, item in client_items.items() if item_id in public_portfolio_items]
+    return [item for item_id, item in public_portfolio_items.items() if item_id in client_items]
+
+def _set_image_path(item, image_path):
+    if not isinstance(image_path, str) or not image_path.strip():
+        raise ValueError("image_path must be a non-empty string.")
+    item.image_path = image_path
+
+def _set_title(item, title):
+    item.title = title
+
+def _set_description(item, description):
+    item.description = description
 
-def update_portfolio_item(item_id, image_path=None, title=None, description=None, 
-                          client_id=None, order_id=None, style_tags=None, is_public=None):
+def _set_client_id(item, client_id):
+    old_key = id_key(item.client_id)
+    item.client_id = normalize_id(client_id)
+    if id_key(item.client_id) != old_key:
+        _unindex(portfolio_items_by_client, old_key, item)
+        _add_to_bucket(portfolio_items_by_client[id_key(item.client_id)], item)
+
+def _set_order_id(item, order_id):
+    old_key = id_key(item.order_id)
+    item.order_id = normalize_id(order_id)
+    if id_key(item.order_id) != old_key:
+        _unindex(portfolio_items_by_order, old_key, item)
+        _add_to_bucket(portfolio_items_by_order[id_key(item.order_id)], item)
+
+def _set_style_tags(item, style_tags):
+    if not isinstance(style_tags, list) or not all(isinstance(t, str) for t in style_tags):
+        raise ValueError("style_tags must be a list of strings.")
+    # Tags the item keeps stay where they are in their buckets
+    old_tags = {tag for tag in item.style_tags if isinstance(tag, str)} # Only str tags are indexed
+    new_tags = set(style_tags)
+    _unindex_tags(item, old_tags - new_tags)
+    item.style_tags = style_tags
+    _index_tags(item, new_tags - old_tags)
+
+def _set_is_public(item, is_public):
+    if not isinstance(is_public, bool):
+        raise ValueError("is_public must be a boolean.")
+    item.is_public = is_public
+    if is_public:
+        _add_to_bucket(public_portfolio_items, item)
+    else:
+        public_portfolio_items.pop(item.item_id, None)
+
+_PORTFOLIO_ITEM_SETTERS = {
+    "image_path": _set_image_path,
+    "title": _set_title,
+    "description": _set_description,
+    "client_id": _set_client_id,
+    "order_id": _set_order_id,
+    "style_tags": _set_style_tags,
+    "is_public": _set_is_public,
+}
+
+def update_portfolio_item(item_id, **updates):
     """
     Updates item details for the given item_id.
-    Only updates attributes for which a new value is provided.
+    Accepts image_path, title, description, client_id, order_id, style_tags and is_public
+    as keyword arguments and only updates attributes for which a new (non-None) value is provided.
     """
+    for field in updates:
+        if field not in _PORTFOLIO_ITEM_SETTERS:
+            raise TypeError(f"update_portfolio_item() got an unexpected keyword argument '{field}'")
+
     item_to_update = get_portfolio_item_by_id(item_id)
     if not item_to_update:
         return None
 
-    if image_path is not None:
-        if not isinstance(image_path, str) or not image_path.strip():
-            raise ValueError("image_path must be a non-empty string.")
-        item_to_update.image_path = image_path
-    if title is not None: # Allow setting to None (empty string might be better for 'clearing')
-        item_to_update.title = title
-    if description is not None: # Allow setting to None
-        item_to_update.description = description
-    if client_id is not None: # Allow setting to None
-        item_to_update.client_id = client_id
-    if order_id is not None: # Allow setting to None
-        item_to_update.order_id = order_id
-    if style_tags is not None:
-        if not isinstance(style_tags, list) or not all(isinstance(t, str) for t in style_tags):
-            raise ValueError("style_tags must be a list of strings.")
-        item_to_update.style_tags = style_tags
-    if is_public is not None:
-        if not isinstance(is_public, bool):
-            raise ValueError("is_public must be a boolean.")
-        item_to_update.is_public = is_public
+    for field, value in updates.items():
+        if value is not None:
+            _PORTFOLIO_ITEM_SETTERS[field](item_to_update, value)
         
     # upload_date is not updated as per requirements
     return item_to_update
@@ -129,8 +236,17 @@ def delete_portfolio_item(item_id):
     Returns True if deletion was successful, False otherwise.
     (Note: actual file deletion from storage is not handled here)
     """
-    item_to_delete = get_portfolio_item_by_id(item_id)
+    try:
+        uuid_obj = to_uuid(item_id)
+    except ValueError:
+        return False
+
+    item_to_delete = portfolio_items_db.pop(uuid_obj, None)
     if item_to_delete:
-        portfolio_items_db.remove(item_to_delete)
+        _unindex(portfolio_items_by_client, id_key(item_to_delete.client_id), item_to_delete)
+        _unindex(portfolio_items_by_order, id_key(item_to_delete.order_id), item_to_delete)
+        _unindex_tags(item_to_delete, item_to_delete.style_tags)
+        public_portfolio_items.pop(item_to_delete.item_id, None)
+        del _creation_order[item_to_delete.item_id]
         return True
     return False
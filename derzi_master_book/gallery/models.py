@@ -1,7 +1,11 @@
 import uuid
 from datetime import date # Using date for upload_date
+from derzi_master_book.ids import normalize_id
 
 class PortfolioItem:
+    __slots__ = ('item_id', 'image_path', 'title', 'description', 'client_id', 'order_id',
+                 'style_tags', 'upload_date', 'is_public')
+
     def __init__(self, image_path, title=None, description=None, client_id=None, 
                  order_id=None, style_tags=None, is_public=False, item_id=None, upload_date=None):
         
@@ -12,11 +16,19 @@ class PortfolioItem:
         self.image_path = image_path
         self.title = title
         self.description = description
-        self.client_id = client_id # Should be UUID in practice
-        self.order_id = order_id # Should be UUID in practice
+        self.client_id = normalize_id(client_id) # Should be UUID in practice
+        self.order_id = normalize_id(order_id) # Should be UUID in practice
         self.style_tags = style_tags if style_tags is not None else []
         self.upload_date = upload_date if upload_date is not None else date.today()
         self.is_public = is_public
 
     def __repr__(self):
         return f"<PortfolioItem {self.item_id} - {self.title or 'Untitled'} - Path: {self.image_path}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, PortfolioItem):
+            return NotImplemented
+        return self.item_id == other.item_id
+
+    def __hash__(self):
+        return hash(self.item_id)
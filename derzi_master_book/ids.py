@@ -0,0 +1,46 @@
+import os
+import uuid
+from functools import lru_cache
+
+@lru_cache(maxsize=4096)
+def _parse_uuid(text):
+    return uuid.UUID(text)
+
+def to_uuid(value):
+    """
+    Returns value as a uuid.UUID, raising ValueError if it is not UUID-like.
+    String forms go through a small LRU cache, as the same ids tend to be looked up repeatedly.
+    """
+    if isinstance(value, uuid.UUID):
+        return value
+    return _parse_uuid(str(value))
+
+def normalize_id(value):
+    """
+    Converts a UUID-like id (e.g. its string form) into a uuid.UUID.
+    None, uuid.UUID objects and values that are not UUID-like are returned unchanged.
+    """
+    if value is None:
+        return value
+    try:
+        return to_uuid(value)
+    except ValueError:
+        return value
+
+def id_key(value):
+    """
+    Returns the key under which an id is stored in the foreign-key indices.
+    UUID-like values become uuid.UUID objects, anything else is compared as a string.
+    """
+    value = normalize_id(value)
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    return str(value)
+
+def new_uuids(count):
+    """
+    Returns a list of count random (version 4) UUIDs drawn from a single os.urandom call,
+    for bulk inserts where one urandom syscall per record would dominate.
+    """
+    raw = os.urandom(16 * count)
+    return [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, 16 * count, 16)]
@@ -0,0 +1,14 @@
+def add_in_creation_order(bucket, record_id, record, creation_order):
+    """
+    Adds a record to one bucket of an index, keeping the bucket in creation order like the
+    main db dict. creation_order maps record ids to their creation position. New records just
+    append; an older record moved into the bucket by an update is put back in its place.
+    """
+    if record_id in bucket:
+        return
+    if bucket and creation_order[next(reversed(bucket))] > creation_order[record_id]:
+        entries = sorted([*bucket.items(), (record_id, record)], key=lambda entry: creation_order[entry[0]])
+        bucket.clear()
+        bucket.update(entries)
+    else:
+        bucket[record_id] = record
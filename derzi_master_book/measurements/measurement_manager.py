@@ -1,9 +1,36 @@
 from .models import MeasurementTemplate, CustomMeasurement
+from derzi_master_book.ids import id_key, new_uuids, to_uuid
+from collections import defaultdict
 from datetime import datetime
-import uuid # Required for type checking if an ID is a valid UUID
 
-measurement_templates_db = []
-custom_measurements_db = []
+measurement_templates_db = {} # template_id -> MeasurementTemplate
+custom_measurements_db = {} # measurement_id -> CustomMeasurement
+custom_measurements_by_client = defaultdict(dict) # key -> {measurement_id: CustomMeasurement}, insertion ordered
+custom_measurements_by_order = defaultdict(dict) # key -> {measurement_id: CustomMeasurement}, insertion ordered
+
+def _unindex(index, key, measurement):
+    """
+    Removes a custom measurement from one bucket of a foreign-key index, dropping empty buckets.
+    """
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(measurement.measurement_id, None)
+        if not bucket:
+            del index[key]
+
+def clear_measurement_templates():
+    """
+    Empties measurement_templates_db.
+    """
+    measurement_templates_db.clear()
+
+def clear_custom_measurements():
+    """
+    Empties custom_measurements_db and every index built on top of it.
+    """
+    custom_measurements_db.clear()
+    custom_measurements_by_client.clear()
+    custom_measurements_by_order.clear()
 
 # --- Measurement Template Management ---
 
@@ -17,7 +44,7 @@ def add_measurement_template(name, fields, diagram_image_path=None):
         raise ValueError("Fields must be a non-empty list of strings.")
         
     new_template = MeasurementTemplate(name=name, fields=fields, diagram_image_path=diagram_image_path)
-    measurement_templates_db.append(new_template)
+    measurement_templates_db[new_template.template_id] = new_template
     return new_template
 
 def get_measurement_template_by_id(template_id):
@@ -25,44 +52,58 @@ def get_measurement_template_by_id(template_id):
     Searches for a measurement template by its template_id in the in-memory database.
     """
     try:
-        uuid_obj = uuid.UUID(str(template_id)) # Validate if template_id is a valid UUID
+        uuid_obj = to_uuid(template_id) # Validate if template_id is a valid UUID
     except ValueError:
         return None # Not a valid UUID format
-        
-    for template in measurement_templates_db:
-        if template.template_id == uuid_obj:
-            return template
-    return None
+
+    return measurement_templates_db.get(uuid_obj)
 
 def list_all_measurement_templates():
     """
     Returns the list of all measurement templates in the in-memory database.
     """
-    return measurement_templates_db
+    return list(measurement_templates_db.values())
+
+def _set_template_name(template, name):
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Template name must be a non-empty string.")
+    template.name = name
+
+def _set_template_fields(template, fields):
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields) or not fields:
+        raise ValueError("Fields must be a non-empty list of strings.")
+    template.fields = fields
 
-def update_measurement_template(template_id, name=None, fields=None, diagram_image_path=None):
+def _set_template_diagram_image_path(template, diagram_image_path):
+    template.diagram_image_path = diagram_image_path
+
+_TEMPLATE_SETTERS = {
+    "name": _set_template_name,
+    "fields": _set_template_fields,
+    "diagram_image_path": _set_template_diagram_image_path,
+}
+
+def update_measurement_template(template_id, **updates):
     """
     Updates a measurement template's information in the in-memory database.
-    Only updates attributes for which a new value is provided.
+    Accepts name, fields and diagram_image_path as keyword arguments and
+    only updates attributes for which a new (non-None) value is provided.
     """
+    for field in updates:
+        if field not in _TEMPLATE_SETTERS:
+            raise TypeError(f"update_measurement_template() got an unexpected keyword argument '{field}'")
+
     try:
-        uuid_obj = uuid.UUID(str(template_id))
+        uuid_obj = to_uuid(template_id)
     except ValueError:
         return None
         
     template_to_update = get_measurement_template_by_id(uuid_obj)
     
     if template_to_update:
-        if name is not None:
-            if not isinstance(name, str) or not name.strip():
-                raise ValueError("Template name must be a non-empty string.")
-            template_to_update.name = name
-        if fields is not None:
-            if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields) or not fields:
-                raise ValueError("Fields must be a non-empty list of strings.")
-            template_to_update.fields = fields
-        if diagram_image_path is not None: # Allow setting to None or a new path
-            template_to_update.diagram_image_path = diagram_image_path
+        for field, value in updates.items():
+            if value is not None:
+                _TEMPLATE_SETTERS[field](template_to_update, value)
         return template_to_update
     return None
 
@@ -71,23 +112,27 @@ def delete_measurement_template(template_id):
     Deletes a measurement template from the in-memory database by its template_id.
     """
     try:
-        uuid_obj = uuid.UUID(str(template_id))
+        uuid_obj = to_uuid(template_id)
     except ValueError:
         return False # Invalid UUID format, so cannot be deleted
         
-    template_to_delete = get_measurement_template_by_id(uuid_obj)
-            
+    template_to_delete = measurement_templates_db.pop(uuid_obj, None)
+
     if template_to_delete:
-        measurement_templates_db.remove(template_to_delete)
         return True
     return False
 
 # --- Custom Measurement Management ---
 
-def add_custom_measurement(order_id, client_id, measurements, notes=None):
+def add_custom_measurement(order_id, client_id, measurements, notes=None, measurement_id=None):
     """
     Creates a new CustomMeasurement instance and adds it to the in-memory database.
+    A new measurement_id is generated unless one is supplied; supplied ids must not already exist.
     """
+    if measurement_id is not None:
+        measurement_id = to_uuid(measurement_id) # Check and store under the same uuid.UUID key the lookups use
+        if measurement_id in custom_measurements_db:
+            raise ValueError(f"Custom measurement with ID {measurement_id} already exists.")
     if not measurements or not isinstance(measurements, dict):
         raise ValueError("Measurements must be a non-empty dictionary.")
     # Further validation for order_id and client_id can be added if they are expected to be UUIDs
@@ -97,65 +142,79 @@ def add_custom_measurement(order_id, client_id, measurements, notes=None):
         order_id=order_id,
         client_id=client_id,
         measurements=measurements,
-        notes=notes
+        notes=notes,
+        measurement_id=measurement_id
     )
-    custom_measurements_db.append(new_measurement)
+    custom_measurements_db[new_measurement.measurement_id] = new_measurement
+    custom_measurements_by_client[id_key(new_measurement.client_id)][new_measurement.measurement_id] = new_measurement
+    custom_measurements_by_order[id_key(new_measurement.order_id)][new_measurement.measurement_id] = new_measurement
     return new_measurement
 
+def bulk_add_custom_measurements(rows):
+    """
+    Adds one custom measurement per dict of add_custom_measurement keyword arguments and returns them in order.
+    Ids for the batch are generated together. If a row fails validation, the rows before it stay added.
+    """
+    return [
+        add_custom_measurement(**{"measurement_id": measurement_id, **row})
+        for row, measurement_id in zip(rows, new_uuids(len(rows)))
+    ]
+
 def get_custom_measurement_by_id(measurement_id):
     """
     Searches for custom measurements by its measurement_id in the in-memory database.
     """
     try:
-        uuid_obj = uuid.UUID(str(measurement_id))
+        uuid_obj = to_uuid(measurement_id)
     except ValueError:
         return None
-        
-    for measurement in custom_measurements_db:
-        if measurement.measurement_id == uuid_obj:
-            return measurement
-    return None
+
+    return custom_measurements_db.get(uuid_obj)
 
 def get_custom_measurements_for_order(order_id):
     """
     Retrieves all custom measurements for a specific order_id.
     """
-    # Assuming order_id is a UUID or a string that can be directly compared
-    order_measurements = []
-    for measurement in custom_measurements_db:
-        if str(measurement.order_id) == str(order_id): # Compare as strings to be safe
-            order_measurements.append(measurement)
-    return order_measurements
+    return list(custom_measurements_by_order.get(id_key(order_id), {}).values())
 
 def get_custom_measurements_for_client(client_id):
     """
     Retrieves all custom measurements for a specific client_id.
     """
-    # Assuming client_id is a UUID or a string that can be directly compared
-    client_measurements = []
-    for measurement in custom_measurements_db:
-        if str(measurement.client_id) == str(client_id): # Compare as strings
-            client_measurements.append(measurement)
-    return client_measurements
+    return list(custom_measurements_by_client.get(id_key(client_id), {}).values())
+
+def _set_custom_measurements(measurement, measurements):
+    if not measurements or not isinstance(measurements, dict):
+        raise ValueError("Measurements must be a non-empty dictionary.")
+    measurement.measurements = measurements
 
-def update_custom_measurement(measurement_id, measurements=None, notes=None):
+def _set_custom_notes(measurement, notes):
+    measurement.notes = notes
+
+_CUSTOM_MEASUREMENT_SETTERS = {
+    "measurements": _set_custom_measurements,
+    "notes": _set_custom_notes,
+}
+
+def update_custom_measurement(measurement_id, **updates):
     """
-    Updates specific custom measurement entries in the in-memory database.
+    Updates specific custom measurement entries (measurements, notes) in the in-memory database.
     """
+    for field in updates:
+        if field not in _CUSTOM_MEASUREMENT_SETTERS:
+            raise TypeError(f"update_custom_measurement() got an unexpected keyword argument '{field}'")
+
     try:
-        uuid_obj = uuid.UUID(str(measurement_id))
+        uuid_obj = to_uuid(measurement_id)
     except ValueError:
         return None
 
     measurement_to_update = get_custom_measurement_by_id(uuid_obj)
     
     if measurement_to_update:
-        if measurements is not None:
-            if not measurements or not isinstance(measurements, dict):
-                raise ValueError("Measurements must be a non-empty dictionary.")
-            measurement_to_update.measurements = measurements
-        if notes is not None: # Allow setting notes to None or a new string
-            measurement_to_update.notes = notes
+        for field, value in updates.items():
+            if value is not None:
+                _CUSTOM_MEASUREMENT_SETTERS[field](measurement_to_update, value)
         # date_taken is not updated as per requirements
         return measurement_to_update
     return None
@@ -165,13 +224,14 @@ def delete_custom_measurement(measurement_id):
     Deletes a custom measurement entry from the in-memory database by its measurement_id.
     """
     try:
-        uuid_obj = uuid.UUID(str(measurement_id))
+        uuid_obj = to_uuid(measurement_id)
     except ValueError:
         return False
         
-    measurement_to_delete = get_custom_measurement_by_id(uuid_obj)
-            
+    measurement_to_delete = custom_measurements_db.pop(uuid_obj, None)
+
     if measurement_to_delete:
-        custom_measurements_db.remove(measurement_to_delete)
+        _unindex(custom_measurements_by_client, id_key(measurement_to_delete.client_id), measurement_to_delete)
+        _unindex(custom_measurements_by_order, id_key(measurement_to_delete.order_id), measurement_to_delete)
         return True
     return False
@@ -1,7 +1,10 @@
 import uuid
-from datetime import datetime
+from derzi_master_book.clock import coarse_now
+from derzi_master_book.ids import normalize_id
 
 class MeasurementTemplate:
+    __slots__ = ('template_id', 'name', 'fields', 'diagram_image_path')
+
     def __init__(self, name, fields, diagram_image_path=None, template_id=None):
         self.template_id = template_id if template_id is not None else uuid.uuid4()
         self.name = name
@@ -11,14 +14,32 @@ class MeasurementTemplate:
     def __repr__(self):
         return f"<MeasurementTemplate {self.template_id} - {self.name}>"
 
+    def __eq__(self, other):
+        if not isinstance(other, MeasurementTemplate):
+            return NotImplemented
+        return self.template_id == other.template_id
+
+    def __hash__(self):
+        return hash(self.template_id)
+
 class CustomMeasurement:
+    __slots__ = ('measurement_id', 'order_id', 'client_id', 'measurements', 'date_taken', 'notes')
+
     def __init__(self, order_id, client_id, measurements, notes=None, measurement_id=None, date_taken=None):
         self.measurement_id = measurement_id if measurement_id is not None else uuid.uuid4()
-        self.order_id = order_id
-        self.client_id = client_id
+        self.order_id = normalize_id(order_id)
+        self.client_id = normalize_id(client_id)
         self.measurements = measurements  # Dictionary
-        self.date_taken = date_taken if date_taken is not None else datetime.now()
+        self.date_taken = date_taken if date_taken is not None else coarse_now()
         self.notes = notes
 
     def __repr__(self):
         return f"<CustomMeasurement {self.measurement_id} - Order {self.order_id} - Client {self.client_id}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, CustomMeasurement):
+            return NotImplemented
+        return self.measurement_id == other.measurement_id
+
+    def __hash__(self):
+        return hash(self.measurement_id)
@@ -1,5 +1,5 @@
 import uuid
-from datetime import datetime
+from derzi_master_book.clock import coarse_now
 from derzi_master_book.clients.models import Client # Assuming Client model is needed for type hinting or future foreign key relations
 
 class Order:
@@ -10,12 +10,15 @@ class Order:
     STATUS_DELIVERED = "Delivered"
     STATUS_CANCELLED = "Cancelled"
     
-    VALID_STATUSES = [STATUS_PENDING, STATUS_IN_PROGRESS, STATUS_READY_FOR_PICKUP, STATUS_DELIVERED, STATUS_CANCELLED]
+    VALID_STATUSES = frozenset([STATUS_PENDING, STATUS_IN_PROGRESS, STATUS_READY_FOR_PICKUP, STATUS_DELIVERED, STATUS_CANCELLED])
+
+    __slots__ = ('order_id', 'client_id', 'order_date', 'deadline', 'status', 'measurements',
+                 'style_details', 'attachments', 'price')
 
     def __init__(self, client_id, deadline, measurements, style_details, attachments=None, price=None, status=STATUS_PENDING, order_id=None, order_date=None):
         self.order_id = order_id if order_id is not None else uuid.uuid4()
         self.client_id = client_id  # This would eventually be a foreign key to a Client instance
-        self.order_date = order_date if order_date is not None else datetime.now()
+        self.order_date = order_date if order_date is not None else coarse_now()
         self.deadline = deadline # This should be a datetime object
         self.status = status
         self.measurements = measurements # Dictionary for now
@@ -25,3 +28,13 @@ class Order:
 
     def __repr__(self):
         return f"<Order {self.order_id} - Client {self.client_id} - Status {self.status}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, Order):
+            return NotImplemented
+        return self.order_id == other.order_id
+
+    def __hash__(self):
+        return hash(self.order_id)
+
+_VALID_STATUSES = Order.VALID_STATUSES
@@ -1,12 +1,27 @@
-from .models import Order
+from .models import Order, _VALID_STATUSES
+from derzi_master_book.ids import id_key, new_uuids, to_uuid
+from collections import defaultdict
 from datetime import datetime
 
-orders_db = []
+orders_db = {} # order_id -> Order
+orders_by_client = defaultdict(dict) # key -> {order_id: Order}, insertion ordered
 
-def add_order(client_id, deadline, measurements, style_details, attachments=None, price=None, status=Order.STATUS_PENDING):
+def clear_orders():
+    """
+    Empties orders_db and every index built on top of it.
+    """
+    orders_db.clear()
+    orders_by_client.clear()
+
+def add_order(client_id, deadline, measurements, style_details, attachments=None, price=None, status=Order.STATUS_PENDING, order_id=None):
     """
     Creates a new Order instance and adds it to the in-memory database.
+    A new order_id is generated unless one is supplied; supplied ids must not already exist.
     """
+    if order_id is not None:
+        order_id = to_uuid(order_id) # Check and store under the same uuid.UUID key the lookups use
+        if order_id in orders_db:
+            raise ValueError(f"Order with ID {order_id} already exists.")
     if not isinstance(deadline, datetime):
         raise ValueError("Deadline must be a datetime object.")
         
@@ -17,35 +32,40 @@ def add_order(client_id, deadline, measurements, style_details, attachments=None
         style_details=style_details,
         attachments=attachments,
         price=price,
-        status=status
+        status=status,
+        order_id=order_id
     )
-    orders_db.append(new_order)
+    orders_db[new_order.order_id] = new_order
+    orders_by_client[id_key(client_id)][new_order.order_id] = new_order
     return new_order
 
+def bulk_add_orders(rows):
+    """
+    Adds one order per dict of add_order keyword arguments and returns them in order.
+    Ids for the batch are generated together. If a row fails validation, the rows before it stay added.
+    """
+    return [
+        add_order(**{"order_id": order_id, **row})
+        for row, order_id in zip(rows, new_uuids(len(rows)))
+    ]
+
 def get_order_by_id(order_id):
     """
-    Searches for an order by its order_id in the in-memory database.
+    Looks up an order by its order_id in the in-memory database.
     """
-    for order in orders_db:
-        if order.order_id == order_id:
-            return order
-    return None
+    return orders_db.get(order_id)
 
 def list_orders_by_client(client_id):
     """
     Returns a list of all orders for a given client_id.
     """
-    client_orders = []
-    for order in orders_db:
-        if order.client_id == client_id:
-            client_orders.append(order)
-    return client_orders
+    return list(orders_by_client.get(id_key(client_id), {}).values())
 
 def list_all_orders():
     """
     Returns the list of all orders in the in-memory database.
     """
-    return orders_db
+    return list(orders_db.values())
 
 def update_order_status(order_id, new_status):
     """
@@ -55,7 +75,7 @@ def update_order_status(order_id, new_status):
     order_to_update = get_order_by_id(order_id)
     
     if order_to_update:
-        if new_status in Order.VALID_STATUSES:
+        if isinstance(new_status, str) and new_status in _VALID_STATUSES: # Unhashable values would raise TypeError
             order_to_update.status = new_status
             return order_to_update
         else:
@@ -63,26 +83,40 @@ def update_order_status(order_id, new_status):
             return None 
     return None # Order not found
 
-def update_order_details(order_id, deadline=None, measurements=None, style_details=None, attachments=None, price=None):
+def _attribute_setter(attribute):
+    def setter(order, value):
+        setattr(order, attribute, value)
+    return setter
+
+def _set_deadline(order, deadline):
+    if not isinstance(deadline, datetime):
+        raise ValueError("Deadline must be a datetime object.")
+    order.deadline = deadline
+
+_ORDER_DETAIL_SETTERS = {
+    "deadline": _set_deadline,
+    "measurements": _attribute_setter("measurements"),
+    "style_details": _attribute_setter("style_details"),
+    "attachments": _attribute_setter("attachments"),
+    "price": _attribute_setter("price"),
+}
+
+def update_order_details(order_id, **updates):
     """
     Updates an order's details in the in-memory database.
-    Only updates attributes for which a new value is provided.
+    Accepts deadline, measurements, style_details, attachments and price as keyword
+    arguments and only updates attributes for which a new (non-None) value is provided.
     """
+    for field in updates:
+        if field not in _ORDER_DETAIL_SETTERS:
+            raise TypeError(f"update_order_details() got an unexpected keyword argument '{field}'")
+
     order_to_update = get_order_by_id(order_id)
     
     if order_to_update:
-        if deadline is not None:
-            if not isinstance(deadline, datetime):
-                raise ValueError("Deadline must be a datetime object.")
-            order_to_update.deadline = deadline
-        if measurements is not None:
-            order_to_update.measurements = measurements
-        if style_details is not None:
-            order_to_update.style_details = style_details
-        if attachments is not None:
-            order_to_update.attachments = attachments
-        if price is not None:
-            order_to_update.price = price
+        for field, value in updates.items():
+            if value is not None:
+                _ORDER_DETAIL_SETTERS[field](order_to_update, value)
         return order_to_update
     return None # Order not found
 
@@ -90,9 +124,13 @@ def delete_order(order_id):
     """
     Deletes an order from the in-memory database by its order_id.
     """
-    order_to_delete = get_order_by_id(order_id)
-            
+    order_to_delete = orders_db.pop(order_id, None)
+
     if order_to_delete:
-        orders_db.remove(order_to_delete)
+        client_key = id_key(order_to_delete.client_id)
+        client_orders = orders_by_client[client_key]
+        del client_orders[order_to_delete.order_id]
+        if not client_orders:
+            del orders_by_client[client_key]
         return True
     return False
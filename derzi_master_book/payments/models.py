@@ -1,7 +1,7 @@
+import sys
 import uuid
-from datetime import date, datetime # Using date for invoice_date, due_date, payment_date
+from datetime import date # Using date for invoice_date, due_date, payment_date
 from decimal import Decimal
-from derzi_master_book.orders.models import Order # For type hinting or future use
 
 class Invoice:
     # Status constants
@@ -12,7 +12,10 @@ class Invoice:
     STATUS_OVERDUE = "Overdue"
     STATUS_CANCELLED = "Cancelled"
     
-    VALID_STATUSES = [STATUS_DRAFT, STATUS_SENT, STATUS_PAID, STATUS_PARTIAL, STATUS_OVERDUE, STATUS_CANCELLED]
+    VALID_STATUSES = frozenset([STATUS_DRAFT, STATUS_SENT, STATUS_PAID, STATUS_PARTIAL, STATUS_OVERDUE, STATUS_CANCELLED])
+
+    __slots__ = ('invoice_id', 'order_id', 'invoice_date', 'due_date', 'total_amount', 'status',
+                 'notes', 'total_paid')
 
     def __init__(self, order_id, due_date, total_amount, invoice_id=None, invoice_date=None, status=STATUS_DRAFT, notes=None):
         if not isinstance(due_date, date):
@@ -21,16 +24,17 @@ class Invoice:
             raise ValueError("total_amount must be a Decimal object.")
         if total_amount < Decimal('0.00'):
             raise ValueError("total_amount cannot be negative.")
-        if status not in self.VALID_STATUSES:
-            raise ValueError(f"Invalid status: {status}. Must be one of {self.VALID_STATUSES}")
+        if not isinstance(status, str) or status not in self.VALID_STATUSES:
+            raise ValueError(f"Invalid status: {status}. Must be one of {sorted(self.VALID_STATUSES)}")
 
         self.invoice_id = invoice_id if invoice_id is not None else uuid.uuid4()
         self.order_id = order_id # Should be a UUID type in practice
         self.invoice_date = invoice_date if invoice_date is not None else date.today()
         self.due_date = due_date
         self.total_amount = total_amount
-        self.status = status
+        self.status = sys.intern(status) # One shared str per status value
         self.notes = notes
+        self.total_paid = Decimal('0.00') # Sum of payments, maintained by payment_manager
 
     def __repr__(self):
         return f"<Invoice {self.invoice_id} - Order {self.order_id} - Amount {self.total_amount} - Status {self.status}>"
@@ -42,21 +46,25 @@ class Payment:
     METHOD_BANK_TRANSFER = "Bank Transfer"
     METHOD_OTHER = "Other"
     
-    VALID_PAYMENT_METHODS = [METHOD_CASH, METHOD_CREDIT_CARD, METHOD_BANK_TRANSFER, METHOD_OTHER]
+    VALID_PAYMENT_METHODS = frozenset([METHOD_CASH, METHOD_CREDIT_CARD, METHOD_BANK_TRANSFER, METHOD_OTHER])
+
+    __slots__ = ('payment_id', 'invoice_id', 'payment_date', 'amount_paid', 'payment_method',
+                 'transaction_id', 'notes')
 
     def __init__(self, invoice_id, amount_paid, payment_method, payment_id=None, payment_date=None, transaction_id=None, notes=None):
         if not isinstance(amount_paid, Decimal):
             raise ValueError("amount_paid must be a Decimal object.")
         if amount_paid <= Decimal('0.00'): # Payments should be positive
             raise ValueError("amount_paid must be a positive value.")
-        if payment_method not in self.VALID_PAYMENT_METHODS:
-            raise ValueError(f"Invalid payment_method: {payment_method}. Must be one of {self.VALID_PAYMENT_METHODS}")
+        # The str check keeps unhashable values from raising TypeError in the frozenset lookup
+        if not isinstance(payment_method, str) or payment_method not in self.VALID_PAYMENT_METHODS:
+            raise ValueError(f"Invalid payment_method: {payment_method}. Must be one of {sorted(self.VALID_PAYMENT_METHODS)}")
 
         self.payment_id = payment_id if payment_id is not None else uuid.uuid4()
         self.invoice_id = invoice_id # Should be a UUID type
         self.payment_date = payment_date if payment_date is not None else date.today()
         self.amount_paid = amount_paid
-        self.payment_method = payment_method
+        self.payment_method = sys.intern(payment_method)
         self.transaction_id = transaction_id
         self.notes = notes
 
@@ -2,23 +2,73 @@ from .models import Invoice, Payment
 from derzi_master_book.orders.models import Order # For fetching order details
 from derzi_master_book.orders.order_manager import get_order_by_id as get_order_by_id_from_order_manager # To get order price
 
+from derzi_master_book.ids import id_key, new_uuids, to_uuid
+from collections import defaultdict
 from datetime import date, datetime
-import uuid
+import sys
 from decimal import Decimal
+import logging
 
-invoices_db = []
-payments_db = []
+logger = logging.getLogger(__name__)
+
+invoices_db = {} # invoice_id -> Invoice
+payments_db = {} # payment_id -> Payment
+invoices_by_order = defaultdict(dict) # order key -> {invoice_id: Invoice}, insertion ordered
+payments_by_invoice = defaultdict(dict) # invoice key -> {payment_id: Payment}, insertion ordered
+open_invoices = {} # invoice_id -> Invoice for invoices not yet Paid or Cancelled
+
+_CLOSED_STATUSES = frozenset([Invoice.STATUS_PAID, Invoice.STATUS_CANCELLED])
+# Open statuses the overdue sweep moves to Overdue once the due_date has passed
+_OVERDUE_CANDIDATE_STATUSES = frozenset([Invoice.STATUS_DRAFT, Invoice.STATUS_SENT, Invoice.STATUS_PARTIAL])
+
+def _unindex(index, key, record_id):
+    """
+    Removes a record from one bucket of a foreign-key index, dropping empty buckets.
+    """
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.pop(record_id, None)
+        if not bucket:
+            del index[key]
+
+def _set_invoice_status(invoice, status):
+    """
+    Sets an invoice's status and keeps open_invoices in step with it.
+    """
+    invoice.status = sys.intern(status)
+    if status in _CLOSED_STATUSES:
+        open_invoices.pop(invoice.invoice_id, None)
+    else:
+        open_invoices[invoice.invoice_id] = invoice
+
+def clear_invoices():
+    """
+    Removes all invoices from the in-memory database.
+    """
+    invoices_db.clear()
+    open_invoices.clear()
+    invoices_by_order.clear()
+
+def clear_payments():
+    """
+    Removes all payments from the in-memory database.
+    """
+    payments_db.clear()
+    payments_by_invoice.clear()
 
 # --- Invoice Functions ---
 
-def create_invoice_for_order(order_id, due_date, notes=None):
+def create_invoice_for_order(order_id, due_date, notes=None, invoice_id=None):
     """
     Creates an Invoice for a given order_id.
     Fetches order price to set as total_amount.
+    A new invoice_id is generated unless one is supplied; supplied ids must not already exist.
     """
-    # In a real app, you'd fetch the order from order_manager or a shared data service.
-    # For now, we'll assume a function get_order_by_id_from_order_manager exists and can be used.
-    order_instance = get_order_by_id_from_order_manager(order_id) 
+    if invoice_id is not None:
+        invoice_id = to_uuid(invoice_id) # Check and store under the same uuid.UUID key the lookups use
+        if invoice_id in invoices_db:
+            raise ValueError(f"Invoice with ID {invoice_id} already exists.")
+    order_instance = get_order_by_id_from_order_manager(order_id)
 
     if not order_instance:
         raise ValueError(f"Order with ID {order_id} not found.")
@@ -26,48 +76,55 @@ def create_invoice_for_order(order_id, due_date, notes=None):
     if order_instance.price is None:
         raise ValueError(f"Order {order_id} does not have a price set. Cannot create invoice.")
 
-    # Ensure order_instance.price is a Decimal
-    order_total_amount = Decimal(str(order_instance.price))
+    # Ensure order_instance.price is a Decimal; prices that already are need no str() round trip
+    order_total_amount = order_instance.price
+    if not isinstance(order_total_amount, Decimal):
+        order_total_amount = Decimal(str(order_total_amount))
 
     new_invoice = Invoice(
         order_id=order_id, 
         due_date=due_date, 
         total_amount=order_total_amount, 
         notes=notes,
-        status=Invoice.STATUS_DRAFT # Initial status
+        status=Invoice.STATUS_DRAFT, # Initial status
+        invoice_id=invoice_id
     )
-    invoices_db.append(new_invoice)
+    invoices_db[new_invoice.invoice_id] = new_invoice
+    open_invoices[new_invoice.invoice_id] = new_invoice
+    invoices_by_order[id_key(order_id)][new_invoice.invoice_id] = new_invoice
     return new_invoice
 
+def bulk_create_invoices_for_orders(rows):
+    """
+    Creates one invoice per dict of create_invoice_for_order keyword arguments and returns them in order.
+    Ids for the batch are generated together. If a row fails validation, the rows before it stay added.
+    """
+    return [
+        create_invoice_for_order(**{"invoice_id": invoice_id, **row})
+        for row, invoice_id in zip(rows, new_uuids(len(rows)))
+    ]
+
 def get_invoice_by_id(invoice_id):
     """
     Searches for an invoice by its invoice_id.
     """
     try:
-        uuid_obj = uuid.UUID(str(invoice_id))
+        uuid_obj = to_uuid(invoice_id)
     except ValueError:
         return None
-    for invoice in invoices_db:
-        if invoice.invoice_id == uuid_obj:
-            return invoice
-    return None
+    return invoices_db.get(uuid_obj)
 
 def get_invoices_for_order(order_id):
     """
     Returns a list of all invoices for a given order_id.
     """
-    # Assuming order_id is a UUID or string
-    order_invoices = []
-    for invoice in invoices_db:
-        if str(invoice.order_id) == str(order_id):
-            order_invoices.append(invoice)
-    return order_invoices
+    return list(invoices_by_order.get(id_key(order_id), {}).values())
 
 def list_all_invoices():
     """
     Returns the list of all invoices.
     """
-    return invoices_db
+    return list(invoices_db.values())
 
 def update_invoice_status(invoice_id, new_status):
     """
@@ -77,15 +134,19 @@ def update_invoice_status(invoice_id, new_status):
     if not invoice_to_update:
         return None
     
-    if new_status not in Invoice.VALID_STATUSES:
-        raise ValueError(f"Invalid status: {new_status}. Must be one of {Invoice.VALID_STATUSES}")
+    if not isinstance(new_status, str) or new_status not in Invoice.VALID_STATUSES:
+        raise ValueError(f"Invalid status: {new_status}. Must be one of {sorted(Invoice.VALID_STATUSES)}")
     
-    invoice_to_update.status = new_status
+    _set_invoice_status(invoice_to_update, new_status)
     return invoice_to_update
 
-def update_invoice_details(invoice_id, due_date=None, notes=None):
+# Default for update arguments where None is a meaningful new value
+_UNSET = object()
+
+def update_invoice_details(invoice_id, due_date=None, notes=_UNSET):
     """
     Updates an invoice's due_date or notes.
+    notes is left unchanged unless given; passing notes=None clears them.
     """
     invoice_to_update = get_invoice_by_id(invoice_id)
     if not invoice_to_update:
@@ -95,7 +156,7 @@ def update_invoice_details(invoice_id, due_date=None, notes=None):
         if not isinstance(due_date, date):
             raise ValueError("due_date must be a date object.")
         invoice_to_update.due_date = due_date
-    if notes is not None: # Allows setting notes to None or a new value
+    if notes is not _UNSET: # Allows setting notes to None or a new value
         invoice_to_update.notes = notes
     return invoice_to_update
 
@@ -108,20 +169,26 @@ def delete_invoice(invoice_id):
     if not invoice_to_delete:
         return False
     
-    # Also delete associated payments
-    payments_for_invoice = get_payments_for_invoice(invoice_id)
-    for payment in payments_for_invoice:
-        payments_db.remove(payment)
+    # Also delete associated payments, dropping their index bucket in one go
+    for payment_id in payments_by_invoice.pop(id_key(invoice_to_delete.invoice_id), {}):
+        payments_db.pop(payment_id, None)
         
-    invoices_db.remove(invoice_to_delete)
+    invoices_db.pop(invoice_to_delete.invoice_id, None)
+    open_invoices.pop(invoice_to_delete.invoice_id, None)
+    _unindex(invoices_by_order, id_key(invoice_to_delete.order_id), invoice_to_delete.invoice_id)
     return True
 
 # --- Payment Functions ---
 
-def add_payment_to_invoice(invoice_id, amount_paid, payment_method, transaction_id=None, notes=None):
+def _record_payment(invoice_id, amount_paid, payment_method, transaction_id=None, notes=None, payment_id=None):
     """
-    Adds a payment record to an invoice.
+    Creates a payment, stores and indexes it and adds it to the invoice's total_paid,
+    without recalculating the invoice status. Returns the invoice and the payment.
     """
+    if payment_id is not None:
+        payment_id = to_uuid(payment_id) # Check and store under the same uuid.UUID key the lookups use
+        if payment_id in payments_db:
+            raise ValueError(f"Payment with ID {payment_id} already exists.")
     invoice = get_invoice_by_id(invoice_id)
     if not invoice:
         raise ValueError(f"Invoice with ID {invoice_id} not found.")
@@ -132,44 +199,66 @@ def add_payment_to_invoice(invoice_id, amount_paid, payment_method, transaction_
         amount_paid=amount_paid,
         payment_method=payment_method,
         transaction_id=transaction_id,
-        notes=notes
+        notes=notes,
+        payment_id=payment_id
     )
-    payments_db.append(new_payment)
+    payments_db[new_payment.payment_id] = new_payment
+    payments_by_invoice[id_key(invoice_id)][new_payment.payment_id] = new_payment
+    invoice.total_paid += new_payment.amount_paid
+    return invoice, new_payment
+
+def add_payment_to_invoice(invoice_id, amount_paid, payment_method, transaction_id=None, notes=None, payment_id=None):
+    """
+    Adds a payment record to an invoice.
+    A new payment_id is generated unless one is supplied; supplied ids must not already exist.
+    """
+    invoice, new_payment = _record_payment(invoice_id, amount_paid, payment_method,
+                                           transaction_id=transaction_id, notes=notes, payment_id=payment_id)
     
-    # Placeholder for updating invoice status based on payment
-    # calculate_invoice_status_after_payment(invoice_id)
+    calculate_invoice_status_after_payment(invoice.invoice_id)
     
     return new_payment
 
+def bulk_add_payments_to_invoices(rows):
+    """
+    Adds one payment per dict of add_payment_to_invoice keyword arguments and returns them in order.
+    Ids for the batch are generated together, and each affected invoice's status is recalculated
+    once at the end rather than after every payment. If a row fails validation, the rows before
+    it stay added (and their invoices are still recalculated).
+    """
+    new_payments = []
+    touched_invoices = {}
+    try:
+        for row, payment_id in zip(rows, new_uuids(len(rows))):
+            invoice, new_payment = _record_payment(**{"payment_id": payment_id, **row})
+            touched_invoices[invoice.invoice_id] = invoice
+            new_payments.append(new_payment)
+    finally:
+        for invoice_id in touched_invoices:
+            calculate_invoice_status_after_payment(invoice_id)
+    return new_payments
+
 def get_payment_by_id(payment_id):
     """
     Searches for a payment by its payment_id.
     """
     try:
-        uuid_obj = uuid.UUID(str(payment_id))
+        uuid_obj = to_uuid(payment_id)
     except ValueError:
         return None
-    for payment in payments_db:
-        if payment.payment_id == uuid_obj:
-            return payment
-    return None
+    return payments_db.get(uuid_obj)
 
 def get_payments_for_invoice(invoice_id):
     """
     Returns a list of all payments for a given invoice_id.
     """
-    # Assuming invoice_id is a UUID or string
-    invoice_payments = []
-    for payment in payments_db:
-        if str(payment.invoice_id) == str(invoice_id):
-            invoice_payments.append(payment)
-    return invoice_payments
+    return list(payments_by_invoice.get(id_key(invoice_id), {}).values())
 
 def list_all_payments():
     """
     Returns the list of all payments.
     """
-    return payments_db
+    return list(payments_db.values())
 
 def update_payment_details(payment_id, amount_paid=None, payment_method=None, transaction_id=None, notes=None):
     """
@@ -179,25 +268,32 @@ def update_payment_details(payment_id, amount_paid=None, payment_method=None, tr
     if not payment_to_update:
         return None
 
+    # Validate every field before changing anything, so a bad value leaves the payment,
+    # the invoice's total_paid and its status untouched
     if amount_paid is not None:
         if not isinstance(amount_paid, Decimal):
             raise ValueError("amount_paid must be a Decimal object.")
         if amount_paid <= Decimal('0.00'):
             raise ValueError("amount_paid must be a positive value.")
+    if payment_method is not None:
+        if not isinstance(payment_method, str) or payment_method not in Payment.VALID_PAYMENT_METHODS:
+            raise ValueError(f"Invalid payment_method: {payment_method}. Must be one of {sorted(Payment.VALID_PAYMENT_METHODS)}")
+
+    if amount_paid is not None:
+        invoice = get_invoice_by_id(payment_to_update.invoice_id)
+        if invoice:
+            invoice.total_paid += amount_paid - payment_to_update.amount_paid
         payment_to_update.amount_paid = amount_paid
-    
     if payment_method is not None:
-        if payment_method not in Payment.VALID_PAYMENT_METHODS:
-            raise ValueError(f"Invalid payment_method: {payment_method}. Must be one of {Payment.VALID_PAYMENT_METHODS}")
-        payment_to_update.payment_method = payment_method
+        payment_to_update.payment_method = sys.intern(payment_method)
         
     if transaction_id is not None: # Allows setting to None or new value
         payment_to_update.transaction_id = transaction_id
     if notes is not None: # Allows setting to None or new value
         payment_to_update.notes = notes
         
-    # If amount_paid was changed, the linked invoice status might need recalculation.
-    # calculate_invoice_status_after_payment(payment_to_update.invoice_id)
+    if amount_paid is not None:
+        calculate_invoice_status_after_payment(payment_to_update.invoice_id)
     
     return payment_to_update
 
@@ -210,63 +306,89 @@ def delete_payment(payment_id):
         return False
     
     invoice_id_of_deleted_payment = payment_to_delete.invoice_id
-    payments_db.remove(payment_to_delete)
+    payments_db.pop(payment_to_delete.payment_id, None)
+    _unindex(payments_by_invoice, id_key(invoice_id_of_deleted_payment), payment_to_delete.payment_id)
+    invoice = get_invoice_by_id(invoice_id_of_deleted_payment)
+    if invoice:
+        invoice.total_paid -= payment_to_delete.amount_paid
     
-    # After deleting a payment, the linked invoice status might need recalculation.
-    # calculate_invoice_status_after_payment(invoice_id_of_deleted_payment)
+    calculate_invoice_status_after_payment(invoice_id_of_deleted_payment)
     
     return True
 
 # --- Helper for Invoice Status (Conceptual) ---
-def calculate_invoice_status_after_payment(invoice_id):
+def _status_after_payment(invoice, today=None):
     """
-    Calculates and updates the invoice status based on its total amount and sum of payments.
-    This is a more advanced feature and is simplified here.
+    Returns the status an invoice should move to given its running total_paid,
+    or None if it should keep its current status. today defaults to date.today()
+    and is only needed for unpaid invoices.
     """
-    invoice = get_invoice_by_id(invoice_id)
-    if not invoice:
-        return
-
     if invoice.status == Invoice.STATUS_CANCELLED: # Don't update cancelled invoices
-        return
+        return None
 
-    payments = get_payments_for_invoice(invoice_id)
-    total_paid = sum(p.amount_paid for p in payments)
+    total_paid = invoice.total_paid
 
     if total_paid >= invoice.total_amount:
-        update_invoice_status(invoice_id, Invoice.STATUS_PAID)
+        return Invoice.STATUS_PAID
     elif total_paid > Decimal('0.00') and total_paid < invoice.total_amount:
-        update_invoice_status(invoice_id, Invoice.STATUS_PARTIAL)
+        return Invoice.STATUS_PARTIAL
     elif total_paid == Decimal('0.00'):
         # If no payments, check due_date to set to Overdue or keep as Draft/Sent
-        if invoice.due_date < date.today() and invoice.status not in [Invoice.STATUS_DRAFT, Invoice.STATUS_SENT]:
-             update_invoice_status(invoice_id, Invoice.STATUS_OVERDUE)
+        if today is None:
+            today = date.today()
+        if invoice.due_date < today and invoice.status not in [Invoice.STATUS_DRAFT, Invoice.STATUS_SENT]:
+            return Invoice.STATUS_OVERDUE
         elif invoice.status == Invoice.STATUS_PAID or invoice.status == Invoice.STATUS_PARTIAL : # if it was paid/partial and now 0, it becomes draft or sent
-            update_invoice_status(invoice_id, Invoice.STATUS_SENT) # Or Draft, depending on workflow
+            return Invoice.STATUS_SENT # Or Draft, depending on workflow
     # Note: STATUS_OVERDUE logic might need to be triggered by a separate daily task or when viewing an invoice
     # For now, if it's not paid or partial, and no payments, it remains its current status or becomes overdue.
     # A more robust system would handle the DRAFT -> SENT -> OVERDUE transitions more explicitly.
+    return None
+
+def recalculate_invoice_status(invoice_id):
+    """
+    Re-applies the payment status rules to a single invoice, e.g. after its due_date was changed.
+    Returns the invoice, or None if it does not exist.
+    """
+    invoice = get_invoice_by_id(invoice_id)
+    if not invoice:
+        return None
+
+    new_status = _status_after_payment(invoice)
+    if new_status is not None:
+        _set_invoice_status(invoice, new_status)
+    return invoice
+
+def calculate_invoice_status_after_payment(invoice_id):
+    """
+    Calculates and updates the invoice status based on its total amount and sum of payments.
+    The sum is the invoice's running total_paid, kept up to date by the payment functions.
+    This is a more advanced feature and is simplified here.
+    """
+    invoice = recalculate_invoice_status(invoice_id)
+    if not invoice:
+        return
     
     # This is a basic implementation. A full implementation would need more robust logic
     # for status transitions (e.g., handling DRAFT, SENT states before PAID/PARTIAL/OVERDUE).
-    print(f"Conceptual: Recalculated status for invoice {invoice_id} based on payments. Total paid: {total_paid}")
-
-# Example of how it might be integrated:
-# In add_payment_to_invoice:
-#   ...
-#   payments_db.append(new_payment)
-#   calculate_invoice_status_after_payment(invoice.invoice_id) # Call the helper
-#   return new_payment
-
-# In update_payment_details:
-#   ...
-#   if amount_paid is not None:
-#       payment_to_update.amount_paid = amount_paid
-#       calculate_invoice_status_after_payment(payment_to_update.invoice_id) # Call helper
-#   ...
-
-# In delete_payment:
-#   ...
-#   payments_db.remove(payment_to_delete)
-#   calculate_invoice_status_after_payment(invoice_id_of_deleted_payment) # Call helper
-#   return True
+    logger.debug("Recalculated status for invoice %s based on payments. Total paid: %s", invoice_id, invoice.total_paid)
+
+def recalculate_invoice_statuses(today=None):
+    """
+    Overdue sweep: applies the calculate_invoice_status_after_payment rules to every open
+    invoice in one pass, then marks Draft, Sent and Partial invoices whose due_date has passed
+    as Overdue. today is read once for the whole batch.
+    Paid and Cancelled invoices are skipped: payment changes already recalculate them.
+    Returns the invoices whose status changed.
+    """
+    if today is None:
+        today = date.today()
+    changed = []
+    for invoice in list(open_invoices.values()):
+        new_status = _status_after_payment(invoice, today) or invoice.status
+        if new_status in _OVERDUE_CANDIDATE_STATUSES and invoice.due_date < today:
+            new_status = Invoice.STATUS_OVERDUE
+        if new_status != invoice.status:
+            _set_invoice_status(invoice, new_status)
+            changed.append(invoice)
+    return changed
@@ -1,3 +1,4 @@
+import sys
 import uuid
 
 class AppSettings:
@@ -5,13 +6,13 @@ class AppSettings:
     THEME_LIGHT = "light"
     THEME_DARK = "dark"
     THEME_SYSTEM_DEFAULT = "system_default"
-    VALID_THEMES = [THEME_LIGHT, THEME_DARK, THEME_SYSTEM_DEFAULT]
+    VALID_THEMES = frozenset([THEME_LIGHT, THEME_DARK, THEME_SYSTEM_DEFAULT])
 
     # Language constants (examples)
     LANG_ENGLISH = "en"
     LANG_TURKISH = "tr"
     LANG_FRENCH = "fr"
-    VALID_LANGUAGES = [LANG_ENGLISH, LANG_TURKISH, LANG_FRENCH]
+    VALID_LANGUAGES = frozenset([LANG_ENGLISH, LANG_TURKISH, LANG_FRENCH])
 
     DEFAULT_SETTINGS_ID = "global_app_settings"
 
@@ -19,17 +20,19 @@ class AppSettings:
                  language=LANG_ENGLISH, backup_enabled=False, backup_location=None, 
                  sync_frequency_hours=None):
         
-        if theme not in self.VALID_THEMES:
+        # The str check comes first: unhashable values (e.g. a list from a corrupted file)
+        # would make the frozenset membership test raise TypeError
+        if not isinstance(theme, str) or theme not in self.VALID_THEMES:
             # Fallback to default if an invalid theme is somehow passed during init
             # Or raise ValueError, but for settings, a graceful fallback might be better
             theme = self.THEME_SYSTEM_DEFAULT
-        if language not in self.VALID_LANGUAGES:
+        if not isinstance(language, str) or language not in self.VALID_LANGUAGES:
             # Fallback to default for language
             language = self.LANG_ENGLISH
 
         self.settings_id = settings_id
-        self.theme = theme
-        self.language = language
+        self.theme = sys.intern(theme) # Values loaded from JSON share the constants' str objects
+        self.language = sys.intern(language)
         self.backup_enabled = backup_enabled
         self.backup_location = backup_location
         self.sync_frequency_hours = sync_frequency_hours
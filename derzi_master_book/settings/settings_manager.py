@@ -1,25 +1,43 @@
 import json
 import os
+import sys
 from .models import AppSettings
 
 SETTINGS_FILE_PATH = "derzi_master_book/data/app_settings.json"
 current_settings = None
+_loaded_file_key = None # _settings_file_key() of the file current_settings was loaded from or saved to
 
 def _ensure_data_directory_exists():
     """Ensures the data directory for settings file exists."""
     os.makedirs(os.path.dirname(SETTINGS_FILE_PATH), exist_ok=True)
 
+def _settings_file_key():
+    """
+    Identifies the current version of the settings file by path, mtime and size.
+    Returns None if the file does not exist.
+    """
+    try:
+        stat_result = os.stat(SETTINGS_FILE_PATH)
+    except OSError:
+        return None
+    return (SETTINGS_FILE_PATH, stat_result.st_mtime_ns, stat_result.st_size)
+
 def load_settings():
     """
     Loads settings from SETTINGS_FILE_PATH.
     If the file doesn't exist or is invalid, initializes with defaults and saves.
+    The file is only parsed again if it has changed since it was last loaded or saved.
     """
-    global current_settings
+    global current_settings, _loaded_file_key
     _ensure_data_directory_exists()
+    file_key = _settings_file_key()
+    if current_settings is not None and file_key is not None and file_key == _loaded_file_key:
+        return current_settings
     try:
         with open(SETTINGS_FILE_PATH, 'r') as f:
             data = json.load(f)
             current_settings = AppSettings.from_dict(data)
+        _loaded_file_key = file_key
     except (FileNotFoundError, json.JSONDecodeError):
         current_settings = AppSettings() # Initialize with defaults
         save_settings() # Create the file with default settings
@@ -28,12 +46,17 @@ def load_settings():
 def save_settings():
     """
     Saves the current_settings object to SETTINGS_FILE_PATH as JSON.
+    The file is written to a temporary path and then moved into place, so readers
+    never see a partially written file.
     """
-    global current_settings
+    global current_settings, _loaded_file_key
     _ensure_data_directory_exists()
     if current_settings:
-        with open(SETTINGS_FILE_PATH, 'w') as f:
+        temp_path = SETTINGS_FILE_PATH + ".tmp"
+        with open(temp_path, 'w') as f:
             json.dump(current_settings.to_dict(), f, indent=4)
+        os.replace(temp_path, SETTINGS_FILE_PATH)
+        _loaded_file_key = _settings_file_key()
 
 def get_settings():
     """
@@ -44,6 +67,16 @@ def get_settings():
         load_settings()
     return current_settings
 
+# Per-key value checks for update_setting; keys without an entry accept any value.
+_SETTING_VALIDATORS = {
+    "theme": lambda value: isinstance(value, str) and value in AppSettings.VALID_THEMES,
+    "language": lambda value: isinstance(value, str) and value in AppSettings.VALID_LANGUAGES,
+    "backup_enabled": lambda value: isinstance(value, bool),
+    "backup_location": lambda value: value is None or isinstance(value, str),
+    "sync_frequency_hours": lambda value: value is None or isinstance(value, int),
+}
+_INTERNED_SETTINGS = frozenset(["theme", "language"])
+
 def update_setting(key, value):
     """
     Updates a specific setting by key and value, then saves settings.
@@ -57,30 +90,33 @@ def update_setting(key, value):
         return None 
 
     # Specific validations
-    if key == "theme" and value not in AppSettings.VALID_THEMES:
-        # Or raise ValueError for invalid theme
-        return None 
-    if key == "language" and value not in AppSettings.VALID_LANGUAGES:
-        # Or raise ValueError for invalid language
-        return None
-    if key == "backup_enabled" and not isinstance(value, bool):
-        return None
-    if key == "sync_frequency_hours" and value is not None and not isinstance(value, int):
+    validator = _SETTING_VALIDATORS.get(key)
+    if validator is not None and not validator(value):
+        # Or raise ValueError for invalid values
         return None
+    if key in _INTERNED_SETTINGS:
+        value = sys.intern(value)
+    current_value = getattr(settings, key)
+    if current_value == value and type(current_value) is type(value): # type check keeps True distinct from 1
+        return settings # Nothing changed, so skip rewriting the file
     
     setattr(settings, key, value)
     save_settings()
     return settings
 
 # Convenience getter/setter methods
+# The getters read current_settings directly once it is loaded, skipping the get_settings() call.
 
 def get_theme():
     """Returns the current theme."""
-    return get_settings().theme
+    settings = current_settings
+    if settings is None:
+        settings = get_settings()
+    return settings.theme
 
 def set_theme(theme_name):
     """Sets the application theme."""
-    if theme_name not in AppSettings.VALID_THEMES:
+    if not isinstance(theme_name, str) or theme_name not in AppSettings.VALID_THEMES:
         # Consider raising an error or logging a warning
         print(f"Warning: Invalid theme '{theme_name}'. Not set.")
         return get_settings() # Return current settings without change
@@ -88,18 +124,24 @@ def set_theme(theme_name):
 
 def get_language():
     """Returns the current language."""
-    return get_settings().language
+    settings = current_settings
+    if settings is None:
+        settings = get_settings()
+    return settings.language
 
 def set_language(lang_code):
     """Sets the application language."""
-    if lang_code not in AppSettings.VALID_LANGUAGES:
+    if not isinstance(lang_code, str) or lang_code not in AppSettings.VALID_LANGUAGES:
         print(f"Warning: Invalid language code '{lang_code}'. Not set.")
         return get_settings()
     return update_setting("language", lang_code)
 
 def is_backup_enabled():
     """Checks if backup is enabled."""
-    return get_settings().backup_enabled
+    settings = current_settings
+    if settings is None:
+        settings = get_settings()
+    return settings.backup_enabled
 
 def set_backup_enabled(enabled):
     """Enables or disables backup."""
@@ -110,7 +152,10 @@ def set_backup_enabled(enabled):
 
 def get_backup_location():
     """Returns the backup location."""
-    return get_settings().backup_location
+    settings = current_settings
+    if settings is None:
+        settings = get_settings()
+    return settings.backup_location
 
 def set_backup_location(location):
     """Sets the backup location."""
@@ -121,7 +166,10 @@ def set_backup_location(location):
 
 def get_sync_frequency():
     """Returns the sync frequency in hours."""
-    return get_settings().sync_frequency_hours
+    settings = current_settings
+    if settings is None:
+        settings = get_settings()
+    return settings.sync_frequency_hours
 
 def set_sync_frequency(hours):
     """Sets the sync frequency in hours."""
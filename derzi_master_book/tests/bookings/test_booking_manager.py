@@ -6,62 +6,93 @@ from derzi_master_book.bookings.models import Appointment
 from derzi_master_book.bookings import booking_manager
 
 # For linked dummy data
-from derzi_master_book.clients.models import Client
 from derzi_master_book.clients import client_manager
-from derzi_master_book.orders.models import Order
 from derzi_master_book.orders import order_manager
 
+# An id that is never generated for a stored record, for the not-found cases
+_MISSING_UUID = uuid.UUID(int=0)
+
+_DEFAULT_TYPE = Appointment.TYPE_GENERAL_TASK
+_TYPE_FITTING = Appointment.TYPE_FITTING
+
+def setUpModule():
+    """Start from empty client and order stores; the tests below seed their own."""
+    client_manager.clear_clients()
+    order_manager.clear_orders()
+
+def tearDownModule():
+    """Leave the client and order stores empty for the next test module."""
+    client_manager.clear_clients()
+    order_manager.clear_orders()
+
 class TestBookingManager(unittest.TestCase):
 
-    def setUp(self):
-        """Clear databases before each test for isolation."""
-        booking_manager.appointments_db = []
-        client_manager.clients_db = []
-        order_manager.orders_db = []
+    # A fixed reference time keeps the tests deterministic; datetimes and timedeltas
+    # are immutable, so they can be shared by every test
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    one_hour = timedelta(hours=1)
+    two_hours = timedelta(hours=2)
 
-        # Create dummy client and order for use in Appointment tests
-        self.test_client = client_manager.add_client(name="Test Client B", phone_number="777888999")
-        self.test_client_id = self.test_client.client_id
+    @classmethod
+    def setUpClass(cls):
+        """Create the dummy clients and orders once; the appointment tests only read their ids."""
+        cls.test_client = client_manager.add_client(name="Test Client B", phone_number="777888999")
+        cls.test_client_id = cls.test_client.client_id
 
-        self.another_client = client_manager.add_client(name="Another Client B", phone_number="111000222")
-        self.another_client_id = self.another_client.client_id
+        cls.another_client = client_manager.add_client(name="Another Client B", phone_number="111000222")
+        cls.another_client_id = cls.another_client.client_id
         
-        self.test_order = order_manager.add_order(
-            client_id=self.test_client_id,
-            deadline=datetime.now() + timedelta(days=15),
+        cls.test_order = order_manager.add_order(
+            client_id=cls.test_client_id,
+            deadline=cls.now + timedelta(days=15),
             measurements={"order_specific_measurement": "value"},
             style_details="Test Order Style for Bookings"
         )
-        self.test_order_id = self.test_order.order_id
+        cls.test_order_id = cls.test_order.order_id
 
-        self.another_order = order_manager.add_order(
-            client_id=self.another_client_id,
-            deadline=datetime.now() + timedelta(days=18),
+        cls.another_order = order_manager.add_order(
+            client_id=cls.another_client_id,
+            deadline=cls.now + timedelta(days=18),
             measurements={},
             style_details="Another Test Order for Bookings"
         )
-        self.another_order_id = self.another_order.order_id
-        
-        # Define some standard times for consistent testing
-        self.now = datetime.now()
-        self.one_hour = timedelta(hours=1)
-        self.two_hours = timedelta(hours=2)
+        cls.another_order_id = cls.another_order.order_id
+
+        # Sample appointment fields that do not depend on the per-test time
+        cls._default_appointment_data = {
+            "title": "Default Test Appointment",
+            "client_id": cls.test_client_id,
+            "order_id": cls.test_order_id,
+            "description": "Default description",
+            "location": "Default location",
+            "appointment_type": _DEFAULT_TYPE,
+        }
+
+    # (name, start hour, start minute, end hour, end minute) for test_list_appointments_in_range.
+    # Appt G would be identical to Appt B for that test's purpose, so it is skipped.
+    _RANGE_CASES = [
+        ("A", 10, 0, 11, 0),
+        ("B", 11, 30, 12, 30),
+        ("C", 13, 0, 14, 0),
+        ("D", 9, 0, 15, 0),
+        ("E", 10, 30, 11, 30),
+        ("F", 9, 30, 10, 30),
+        ("H", 8, 0, 9, 0),
+        ("I", 15, 0, 16, 0),
+    ]
 
+    def setUp(self):
+        """Clear the appointments before each test for isolation."""
+        booking_manager.clear_appointments()
 
     def _create_sample_appointment_data(self, **kwargs):
         """Helper to create sample appointment data with defaults."""
-        data = {
+        return {
+            **self._default_appointment_data,
             "start_time": self.now + self.one_hour,
             "end_time": self.now + self.two_hours,
-            "title": "Default Test Appointment",
-            "client_id": self.test_client_id,
-            "order_id": self.test_order_id,
-            "description": "Default description",
-            "location": "Default location",
-            "appointment_type": Appointment.TYPE_GENERAL_TASK,
+            **kwargs,
         }
-        data.update(kwargs)
-        return data
 
     def test_add_appointment(self):
         """Test adding a new appointment."""
@@ -82,7 +113,7 @@ class TestBookingManager(unittest.TestCase):
         self.assertIsInstance(appointment.created_at, datetime)
         
         self.assertEqual(len(booking_manager.appointments_db), 1)
-        self.assertEqual(booking_manager.appointments_db[0], appointment)
+        self.assertEqual(booking_manager.appointments_db[appointment.appointment_id], appointment)
 
         # Test adding with minimal required fields (start_time, end_time, title)
         minimal_data = {
@@ -94,28 +125,49 @@ class TestBookingManager(unittest.TestCase):
         self.assertEqual(len(booking_manager.appointments_db), 2)
         self.assertIsNone(appointment2.client_id)
         self.assertIsNone(appointment2.order_id)
-        self.assertEqual(appointment2.appointment_type, Appointment.TYPE_GENERAL_TASK) # Default type
-
-        # Test for ValueError if end_time is before start_time (model validation)
-        with self.assertRaises(ValueError):
-            invalid_time_data = self._create_sample_appointment_data(
-                start_time=self.now + self.two_hours, 
-                end_time=self.now + self.one_hour
-            )
-            booking_manager.add_appointment(**invalid_time_data)
-
-        # Test for TypeError for missing required fields (Python's arg checking)
-        with self.assertRaises(TypeError):
-            booking_manager.add_appointment(start_time=self.now, title="Test") # Missing end_time
-        with self.assertRaises(TypeError):
-            booking_manager.add_appointment(end_time=self.now, title="Test") # Missing start_time
-        with self.assertRaises(TypeError):
-            booking_manager.add_appointment(start_time=self.now, end_time=self.now + self.one_hour) # Missing title
-
-        # Test adding with an invalid appointment_type (model validation)
+        self.assertEqual(appointment2.appointment_type, _DEFAULT_TYPE) # Default type
+
+        bad_cases = [
+            # end_time before start_time (model validation)
+            (ValueError, self._create_sample_appointment_data(start_time=self.now + self.two_hours, end_time=self.now + self.one_hour)),
+            # Missing required fields (Python's arg checking)
+            (TypeError, {"start_time": self.now, "title": "Test"}), # Missing end_time
+            (TypeError, {"end_time": self.now, "title": "Test"}), # Missing start_time
+            (TypeError, {"start_time": self.now, "end_time": self.now + self.one_hour}), # Missing title
+            # Invalid appointment_type (model validation)
+            (ValueError, self._create_sample_appointment_data(appointment_type="INVALID_TYPE")),
+            (ValueError, self._create_sample_appointment_data(appointment_type=["Fitting"])), # Unhashable
+        ]
+        for expected_error, kwargs in bad_cases:
+            with self.subTest(kwargs=kwargs), self.assertRaises(expected_error):
+                booking_manager.add_appointment(**kwargs)
+        self.assertEqual(len(booking_manager.appointments_db), 2) # Nothing was added
+
+    def test_bulk_add_appointments(self):
+        """Test adding several appointments in one call."""
+        rows = [
+            self._create_sample_appointment_data(title="Bulk A"),
+            self._create_sample_appointment_data(title="Bulk B", client_id=self.another_client_id),
+        ]
+        appts = booking_manager.bulk_add_appointments(rows)
+        self.assertEqual([a.title for a in appts], ["Bulk A", "Bulk B"])
+        self.assertEqual(booking_manager.list_all_appointments(), appts)
+        self.assertEqual(booking_manager.list_appointments_for_client(self.another_client_id), [appts[1]])
+
+        duplicate_rows = [self._create_sample_appointment_data(appointment_id=appts[0].appointment_id)]
         with self.assertRaises(ValueError):
-            invalid_type_data = self._create_sample_appointment_data(appointment_type="INVALID_TYPE")
-            booking_manager.add_appointment(**invalid_type_data)
+            booking_manager.bulk_add_appointments(duplicate_rows)
+
+    def test_add_appointment_with_supplied_id(self):
+        """Test that a supplied appointment_id is stored as a UUID and checked for duplicates in either form."""
+        own_id = uuid.uuid4()
+        appt = booking_manager.add_appointment(**self._create_sample_appointment_data(appointment_id=str(own_id)))
+        self.assertEqual(appt.appointment_id, own_id)
+        self.assertIs(booking_manager.get_appointment_by_id(own_id), appt)
+        for duplicate_id in (own_id, str(own_id)):
+            with self.subTest(duplicate_id=duplicate_id), self.assertRaises(ValueError):
+                booking_manager.add_appointment(**self._create_sample_appointment_data(appointment_id=duplicate_id))
+        self.assertEqual(len(booking_manager.appointments_db), 1)
 
     def test_get_appointment_by_id(self):
         """Test retrieving an appointment by its ID."""
@@ -125,41 +177,64 @@ class TestBookingManager(unittest.TestCase):
         retrieved_appt = booking_manager.get_appointment_by_id(appt1.appointment_id)
         self.assertEqual(retrieved_appt, appt1)
         
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(booking_manager.get_appointment_by_id(non_existent_uuid))
+        self.assertIsNone(booking_manager.get_appointment_by_id(_MISSING_UUID))
         self.assertIsNone(booking_manager.get_appointment_by_id("not-a-uuid-string"))
 
     def test_list_appointments_for_client(self):
         """Test listing appointments for a specific client."""
-        appt1 = booking_manager.add_appointment(**self._create_sample_appointment_data(client_id=self.test_client_id, title="Client1 Appt1"))
-        appt2 = booking_manager.add_appointment(**self._create_sample_appointment_data(client_id=self.another_client_id, title="Client2 Appt1"))
-        appt3 = booking_manager.add_appointment(**self._create_sample_appointment_data(client_id=self.test_client_id, title="Client1 Appt2"))
-
-        client1_appts = booking_manager.list_appointments_for_client(self.test_client_id)
-        self.assertEqual(len(client1_appts), 2)
-        self.assertIn(appt1, client1_appts)
-        self.assertIn(appt3, client1_appts)
-        self.assertNotIn(appt2, client1_appts)
+        appt1 = booking_manager.add_appointment(start_time=self.now + self.one_hour, end_time=self.now + self.two_hours, title="Client1 Appt1", client_id=self.test_client_id)
+        appt2 = booking_manager.add_appointment(start_time=self.now + self.one_hour, end_time=self.now + self.two_hours, title="Client2 Appt1", client_id=self.another_client_id)
+        appt3 = booking_manager.add_appointment(start_time=self.now + self.one_hour, end_time=self.now + self.two_hours, title="Client1 Appt2", client_id=self.test_client_id)
+
+        self.assertCountEqual(booking_manager.list_appointments_for_client(self.test_client_id), [appt1, appt3])
         
         # Test with a client_id that has no appointments
-        yet_another_client_id = uuid.uuid4() 
-        self.assertEqual(booking_manager.list_appointments_for_client(yet_another_client_id), [])
+        self.assertEqual(booking_manager.list_appointments_for_client(_MISSING_UUID), [])
 
     def test_list_appointments_for_order(self):
         """Test listing appointments for a specific order."""
-        appt1 = booking_manager.add_appointment(**self._create_sample_appointment_data(order_id=self.test_order_id, title="Order1 Appt1"))
-        appt2 = booking_manager.add_appointment(**self._create_sample_appointment_data(order_id=self.another_order_id, title="Order2 Appt1"))
-        appt3 = booking_manager.add_appointment(**self._create_sample_appointment_data(order_id=self.test_order_id, title="Order1 Appt2"))
+        appt1 = booking_manager.add_appointment(start_time=self.now + self.one_hour, end_time=self.now + self.two_hours, title="Order1 Appt1", order_id=self.test_order_id)
+        appt2 = booking_manager.add_appointment(start_time=self.now + self.one_hour, end_time=self.now + self.two_hours, title="Order2 Appt1", order_id=self.another_order_id)
+        appt3 = booking_manager.add_appointment(start_time=self.now + self.one_hour, end_time=self.now + self.two_hours, title="Order1 Appt2", order_id=self.test_order_id)
 
-        order1_appts = booking_manager.list_appointments_for_order(self.test_order_id)
-        self.assertEqual(len(order1_appts), 2)
-        self.assertIn(appt1, order1_appts)
-        self.assertIn(appt3, order1_appts)
-        self.assertNotIn(appt2, order1_appts)
+        self.assertCountEqual(booking_manager.list_appointments_for_order(self.test_order_id), [appt1, appt3])
 
         # Test with an order_id that has no appointments
-        yet_another_order_id = uuid.uuid4()
-        self.assertEqual(booking_manager.list_appointments_for_order(yet_another_order_id), [])
+        self.assertEqual(booking_manager.list_appointments_for_order(_MISSING_UUID), [])
+
+    def test_client_and_order_lookups_follow_updates(self):
+        """Test that client/order lookups reflect reassignment and deletion."""
+        appt = booking_manager.add_appointment(**self._create_sample_appointment_data())
+
+        booking_manager.update_appointment(appt.appointment_id, client_id=self.another_client_id, order_id=self.another_order_id)
+        self.assertEqual(booking_manager.list_appointments_for_client(self.test_client_id), [])
+        self.assertEqual(booking_manager.list_appointments_for_client(self.another_client_id), [appt])
+        self.assertEqual(booking_manager.list_appointments_for_order(self.test_order_id), [])
+        self.assertEqual(booking_manager.list_appointments_for_order(str(self.another_order_id)), [appt])
+
+        booking_manager.delete_appointment(appt.appointment_id)
+        self.assertEqual(booking_manager.list_appointments_for_client(self.another_client_id), [])
+        self.assertEqual(booking_manager.list_appointments_for_order(self.another_order_id), [])
+
+    def test_lookups_keep_creation_order_after_updates(self):
+        """Test that client and order lookups stay in creation order when appointments are updated."""
+        a, b, c = booking_manager.bulk_add_appointments([
+            self._create_sample_appointment_data(title=f"Appt {name}") for name in "ABC"
+        ])
+
+        # Updates that keep an appointment's client and order leave it in place
+        booking_manager.update_appointment(a.appointment_id, title="Renamed", client_id=self.test_client_id,
+                                           order_id=str(self.test_order_id))
+        self.assertEqual(booking_manager.list_appointments_for_client(self.test_client_id), [a, b, c])
+        self.assertEqual(booking_manager.list_appointments_for_order(self.test_order_id), [a, b, c])
+
+        # Appointments moved away and back return to their place
+        booking_manager.update_appointment(b.appointment_id, client_id=self.another_client_id)
+        booking_manager.update_appointment(b.appointment_id, client_id=self.test_client_id)
+        self.assertEqual(booking_manager.list_appointments_for_client(self.test_client_id), [a, b, c])
+        booking_manager.update_appointment(c.appointment_id, order_id=self.another_order_id)
+        booking_manager.update_appointment(a.appointment_id, order_id=self.another_order_id)
+        self.assertEqual(booking_manager.list_appointments_for_order(self.another_order_id), [a, c])
 
     def test_list_appointments_in_range(self):
         """Test listing appointments within or overlapping a given time range."""
@@ -175,35 +250,28 @@ class TestBookingManager(unittest.TestCase):
         # Appt I: 15:00 - 16:00 (completely after)
 
         base_time = datetime(2024, 1, 1, 0, 0, 0) # Use a fixed base for predictable times
-
-        appt_a = booking_manager.add_appointment(start_time=base_time.replace(hour=10), end_time=base_time.replace(hour=11), title="Appt A")
-        appt_b = booking_manager.add_appointment(start_time=base_time.replace(hour=11, minute=30), end_time=base_time.replace(hour=12, minute=30), title="Appt B")
-        appt_c = booking_manager.add_appointment(start_time=base_time.replace(hour=13), end_time=base_time.replace(hour=14), title="Appt C")
-        appt_d = booking_manager.add_appointment(start_time=base_time.replace(hour=9), end_time=base_time.replace(hour=15), title="Appt D")
-        appt_e = booking_manager.add_appointment(start_time=base_time.replace(hour=10, minute=30), end_time=base_time.replace(hour=11, minute=30), title="Appt E")
-        appt_f = booking_manager.add_appointment(start_time=base_time.replace(hour=9, minute=30), end_time=base_time.replace(hour=10, minute=30), title="Appt F")
-        # Appt G is identical to Appt B for this test's purpose, so skip explicit G.
-        appt_h = booking_manager.add_appointment(start_time=base_time.replace(hour=8), end_time=base_time.replace(hour=9), title="Appt H")
-        appt_i = booking_manager.add_appointment(start_time=base_time.replace(hour=15), end_time=base_time.replace(hour=16), title="Appt I")
+        # Each distinct (hour, minute) is built once and shared by every appointment that uses it
+        times = {(hour, minute): base_time.replace(hour=hour, minute=minute)
+                 for _, *bounds in self._RANGE_CASES
+                 for hour, minute in (bounds[:2], bounds[2:])}
+
+        appts = {
+            name: booking_manager.add_appointment(start_time=times[start_hour, start_minute],
+                                                  end_time=times[end_hour, end_minute],
+                                                  title=f"Appt {name}")
+            for name, start_hour, start_minute, end_hour, end_minute in self._RANGE_CASES
+        }
 
         # Test Range: 10:00 - 12:00
-        range_start = base_time.replace(hour=10)
+        range_start = times[10, 0]
         range_end = base_time.replace(hour=12)
         
         overlapping_appts = booking_manager.list_appointments_in_range(range_start, range_end)
         
-        self.assertIn(appt_a, overlapping_appts) # 10-11, fully within
-        self.assertNotIn(appt_b, overlapping_appts) # 11:30-12:30, starts in, ends after range_end (if range is exclusive of end time)
-                                                # Actually, (ApptStart < RangeEnd) and (ApptEnd > RangeStart)
-                                                # Appt B: 11:30 < 12:00 (True) AND 12:30 > 10:00 (True) => Should be IN
-        self.assertIn(appt_b, overlapping_appts) # Re-evaluating: Appt B should be included
-        self.assertNotIn(appt_c, overlapping_appts) # 13-14, after range
-        self.assertIn(appt_d, overlapping_appts) # 9-15, encompasses range
-        self.assertIn(appt_e, overlapping_appts) # 10:30-11:30, fully within
-        self.assertIn(appt_f, overlapping_appts) # 9:30-10:30, starts before, ends in
-        self.assertNotIn(appt_h, overlapping_appts) # 8-9, before range
-        self.assertNotIn(appt_i, overlapping_appts) # 15-16, after range
-        
+        # Overlap means (ApptStart < RangeEnd) and (ApptEnd > RangeStart):
+        # A and E lie within the range, B starts in it and ends after it, D encompasses it,
+        # F starts before it and ends in it; C, H and I are completely outside it.
+        self.assertEqual(set(overlapping_appts), {appts[name] for name in "ABDEF"})
         self.assertEqual(len(overlapping_appts), 5, f"Expected 5, got {len(overlapping_appts)}: {[a.title for a in overlapping_appts]}")
 
         # Test range where start_time is after end_time
@@ -215,6 +283,42 @@ class TestBookingManager(unittest.TestCase):
         empty_range_end = base_time.replace(hour=18)
         self.assertEqual(booking_manager.list_appointments_in_range(empty_range_start, empty_range_end), [])
 
+    def test_list_appointments_in_range_large_db(self):
+        """Test range queries once the database is large enough to use the interval tree."""
+        base_time = datetime(2024, 1, 1, 8, 0, 0)
+        appts = [
+            booking_manager.add_appointment(start_time=base_time + timedelta(minutes=15 * i),
+                                            end_time=base_time + timedelta(minutes=15 * i + 45),
+                                            title=f"Appt {i}")
+            for i in range(booking_manager.RANGE_INDEX_MIN_SIZE + 10)
+        ]
+        range_start = base_time + timedelta(hours=5)
+        range_end = base_time + timedelta(hours=6)
+
+        def expected():
+            return [a for a in booking_manager.list_all_appointments() if a.start_time < range_end and a.end_time > range_start]
+
+        # Queries scan until the database has gone unchanged for a few of them, then use the tree;
+        # either way the results come in insertion order
+        for _ in range(booking_manager.RANGE_INDEX_CLEAN_QUERIES):
+            self.assertEqual(booking_manager.list_appointments_in_range(range_start, range_end), expected())
+        self.assertIsNotNone(booking_manager._range_index)
+
+        # Moving, adding and deleting appointments must be reflected in later queries
+        booking_manager.update_appointment(appts[0].appointment_id, start_time=range_start, end_time=range_end)
+        booking_manager.delete_appointment(appts[21].appointment_id)
+        booking_manager.add_appointment(start_time=range_start - self.one_hour, end_time=range_end, title="Late addition")
+        self.assertIsNone(booking_manager._range_index)
+        for _ in range(booking_manager.RANGE_INDEX_CLEAN_QUERIES):
+            self.assertEqual(booking_manager.list_appointments_in_range(range_start, range_end), expected())
+        self.assertIsNotNone(booking_manager._range_index)
+
+        # A change between every query keeps them on the scan, without rebuilding the tree
+        for i in range(booking_manager.RANGE_INDEX_CLEAN_QUERIES + 1):
+            booking_manager.add_appointment(start_time=range_start, end_time=range_end, title=f"Walk-in {i}")
+            self.assertEqual(booking_manager.list_appointments_in_range(range_start, range_end), expected())
+            self.assertIsNone(booking_manager._range_index)
+
     def test_list_all_appointments(self):
         """Test listing all appointments."""
         self.assertEqual(booking_manager.list_all_appointments(), []) # Test with empty db
@@ -222,10 +326,7 @@ class TestBookingManager(unittest.TestCase):
         appt1 = booking_manager.add_appointment(**self._create_sample_appointment_data(title="Appt X"))
         appt2 = booking_manager.add_appointment(**self._create_sample_appointment_data(title="Appt Y"))
         
-        all_appts = booking_manager.list_all_appointments()
-        self.assertEqual(len(all_appts), 2)
-        self.assertIn(appt1, all_appts)
-        self.assertIn(appt2, all_appts)
+        self.assertCountEqual(booking_manager.list_all_appointments(), [appt1, appt2])
 
     def test_update_appointment(self):
         """Test updating an appointment's information."""
@@ -238,7 +339,7 @@ class TestBookingManager(unittest.TestCase):
         new_end_time = self.now + timedelta(days=2, hours=2)
         new_title = "Updated Title"
         new_desc = "Updated description"
-        new_type = Appointment.TYPE_FITTING
+        new_type = _TYPE_FITTING
 
         updated_appt = booking_manager.update_appointment(
             appointment_id=original_id,
@@ -262,17 +363,21 @@ class TestBookingManager(unittest.TestCase):
             booking_manager.update_appointment(original_id, end_time=new_start_time - self.one_hour)
         
         # Test updating a non-existent appointment
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(booking_manager.update_appointment(non_existent_uuid, title="Ghost Appt"))
+        self.assertIsNone(booking_manager.update_appointment(_MISSING_UUID, title="Ghost Appt"))
 
         # Test updating appointment_type to an invalid type
         with self.assertRaises(ValueError):
             booking_manager.update_appointment(original_id, appointment_type="INVALID_TYPE_AGAIN")
+        with self.assertRaises(ValueError):
+            booking_manager.update_appointment(original_id, appointment_type=["Fitting"])
             
         # Test updating title to empty string (should raise ValueError in manager)
         with self.assertRaises(ValueError):
             booking_manager.update_appointment(original_id, title="  ")
 
+        # Test updating an unknown field
+        with self.assertRaises(TypeError):
+            booking_manager.update_appointment(original_id, colour="red")
 
     def test_delete_appointment(self):
         """Test deleting an appointment."""
@@ -288,15 +393,8 @@ class TestBookingManager(unittest.TestCase):
         self.assertIsNone(booking_manager.get_appointment_by_id(appointment_id_to_delete))
         
         # Test deleting a non-existent appointment
-        non_existent_uuid = uuid.uuid4()
-        delete_non_existent_result = booking_manager.delete_appointment(non_existent_uuid)
+        delete_non_existent_result = booking_manager.delete_appointment(_MISSING_UUID)
         self.assertFalse(delete_non_existent_result)
 
-    def tearDown(self):
-        """Clean up databases after each test."""
-        booking_manager.appointments_db = []
-        client_manager.clients_db = []
-        order_manager.orders_db = []
-
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+import random
+import unittest
+
+from derzi_master_book.bookings.interval_tree import IntervalTree
+
+class TestIntervalTree(unittest.TestCase):
+
+    def test_empty_tree(self):
+        """Test querying a tree built from no intervals."""
+        tree = IntervalTree([])
+        self.assertEqual(len(tree), 0)
+        self.assertEqual(tree.overlapping(0, 10), [])
+
+    def test_half_open_boundaries(self):
+        """Test that touching intervals do not count as overlapping."""
+        tree = IntervalTree([(0, 10, "a"), (10, 20, "b"), (20, 30, "c")])
+        self.assertCountEqual(tree.overlapping(10, 20), ["b"])
+        self.assertCountEqual(tree.overlapping(9, 11), ["a", "b"])
+        self.assertEqual(tree.overlapping(30, 40), [])
+
+    def test_matches_linear_scan(self):
+        """Test the tree against a brute-force overlap scan on random data."""
+        rng = random.Random(1234)
+        intervals = []
+        for i in range(500):
+            start = rng.randrange(0, 10000)
+            intervals.append((start, start + rng.randrange(1, 300), i))
+        tree = IntervalTree(intervals)
+        self.assertEqual(len(tree), 500)
+
+        for _ in range(200):
+            range_start = rng.randrange(-100, 10100)
+            range_end = range_start + rng.randrange(1, 500)
+            expected = [v for s, e, v in intervals if s < range_end and e > range_start]
+            self.assertCountEqual(tree.overlapping(range_start, range_end), expected)
+
+if __name__ == '__main__':
+    unittest.main()
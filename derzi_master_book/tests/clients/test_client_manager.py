@@ -7,11 +7,15 @@ from datetime import datetime
 from derzi_master_book.clients.models import Client
 from derzi_master_book.clients import client_manager
 
+def tearDownModule():
+    """Leave the client store empty for the next test module."""
+    client_manager.clear_clients()
+
 class TestClientManager(unittest.TestCase):
 
     def setUp(self):
         """Clear the clients_db before each test for isolation."""
-        client_manager.clients_db = []
+        client_manager.clear_clients()
 
     def test_add_client(self):
         """Test adding a new client."""
@@ -30,7 +34,7 @@ class TestClientManager(unittest.TestCase):
         self.assertIsInstance(client.creation_date, datetime)
         
         self.assertEqual(len(client_manager.clients_db), 1)
-        self.assertEqual(client_manager.clients_db[0], client)
+        self.assertEqual(client_manager.clients_db[client.client_id], client)
 
         # Test adding a client with minimal required fields
         client2 = client_manager.add_client(name="Another User", phone_number="0987654321")
@@ -46,6 +50,43 @@ class TestClientManager(unittest.TestCase):
         with self.assertRaises(TypeError):
             client_manager.add_client(name="No Phone User") # Missing phone_number
 
+    def test_bulk_add_clients(self):
+        """Test adding several clients in one call."""
+        clients = client_manager.bulk_add_clients([
+            {"name": "Bulk One", "phone_number": "1"},
+            {"name": "Bulk Two", "phone_number": "2", "email": "two@example.com"},
+        ])
+        self.assertEqual([c.name for c in clients], ["Bulk One", "Bulk Two"])
+        self.assertEqual(clients[1].email, "two@example.com")
+        self.assertEqual(client_manager.list_all_clients(), clients)
+        for client in clients:
+            self.assertIsInstance(client.client_id, uuid.UUID)
+            self.assertIs(client_manager.get_client_by_id(client.client_id), client)
+
+        # Supplied ids are kept, but must not collide with existing clients
+        own_id = uuid.uuid4()
+        self.assertEqual(client_manager.add_client(name="Own Id", phone_number="3", client_id=own_id).client_id, own_id)
+        with self.assertRaises(ValueError):
+            client_manager.add_client(name="Duplicate", phone_number="4", client_id=own_id)
+        # Ids given as strings are stored as UUIDs, so their duplicates are caught too
+        with self.assertRaises(ValueError):
+            client_manager.add_client(name="Duplicate", phone_number="4", client_id=str(own_id))
+        str_id = uuid.uuid4()
+        client = client_manager.add_client(name="String Id", phone_number="5", client_id=str(str_id))
+        self.assertEqual(client.client_id, str_id)
+        self.assertIs(client_manager.get_client_by_id(str_id), client)
+
+    def test_client_equality_by_id(self):
+        """Test that clients compare and hash by client_id."""
+        shared_id = uuid.uuid4()
+        client = Client(name="Same", phone_number="1", client_id=shared_id)
+        renamed = Client(name="Renamed", phone_number="2", client_id=shared_id)
+        other = Client(name="Same", phone_number="1")
+        self.assertEqual(client, renamed)
+        self.assertNotEqual(client, other)
+        self.assertNotEqual(client, shared_id)
+        self.assertEqual(len({client, renamed, other}), 2)
+
     def test_get_client_by_id(self):
         """Test retrieving a client by their ID."""
         client1 = client_manager.add_client(name="Client One", phone_number="11111")
@@ -68,10 +109,7 @@ class TestClientManager(unittest.TestCase):
         client1 = client_manager.add_client(name="Client Alpha", phone_number="123")
         client2 = client_manager.add_client(name="Client Beta", phone_number="456")
         
-        all_clients = client_manager.list_all_clients()
-        self.assertEqual(len(all_clients), 2)
-        self.assertIn(client1, all_clients)
-        self.assertIn(client2, all_clients)
+        self.assertCountEqual(client_manager.list_all_clients(), [client1, client2])
 
     def test_update_client(self):
         """Test updating a client's information."""
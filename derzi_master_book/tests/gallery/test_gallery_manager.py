@@ -11,50 +11,71 @@ from derzi_master_book.clients import client_manager
 from derzi_master_book.orders.models import Order
 from derzi_master_book.orders import order_manager
 
+# An id that is never generated for a stored record, for the not-found cases
+_MISSING_UUID = uuid.UUID(int=0)
+
 class TestGalleryManager(unittest.TestCase):
 
-    def setUp(self):
-        """Clear databases and set up dummy data before each test."""
-        gallery_manager.portfolio_items_db = []
-        client_manager.clients_db = []
-        order_manager.orders_db = []
+    @classmethod
+    def setUpClass(cls):
+        """Create the dummy clients and orders once; the tests only read their ids."""
+        client_manager.clear_clients()
+        order_manager.clear_orders()
+        cls.now = datetime.now() # Read the clock once for every fixture deadline
 
         # Create dummy client and order for use in PortfolioItem tests
-        self.test_client = client_manager.add_client(name="Test Client G", phone_number="555666777")
-        self.test_client_id = self.test_client.client_id
+        cls.test_client, cls.another_client = client_manager.bulk_add_clients([
+            {"name": "Test Client G", "phone_number": "555666777"},
+            {"name": "Another Client G", "phone_number": "888999000"},
+        ])
+        cls.test_client_id = cls.test_client.client_id
+        cls.another_client_id = cls.another_client.client_id
+
+        cls.test_order, cls.another_order = order_manager.bulk_add_orders([
+            {
+                "client_id": cls.test_client_id,
+                "deadline": cls.now + timedelta(days=20), # Using datetime for order
+                "measurements": {"sample_gallery": "data"},
+                "style_details": "Test Order for Gallery Item",
+            },
+            {
+                "client_id": cls.another_client_id,
+                "deadline": cls.now + timedelta(days=22), # Using datetime for order
+                "measurements": {},
+                "style_details": "Another Test Order for Gallery",
+            },
+        ])
+        cls.test_order_id = cls.test_order.order_id
+        cls.another_order_id = cls.another_order.order_id
+
+        # Sample item fields; only style_tags is mutable, so it is copied per item
+        cls._default_item_data = {
+            "image_path": "path/to/default_image.jpg",
+            "title": "Default Title",
+            "description": "Default description.",
+            "client_id": cls.test_client_id,
+            "order_id": cls.test_order_id,
+            "is_public": False,
+        }
+        cls._default_style_tags = ("default", "sample")
 
-        self.another_client = client_manager.add_client(name="Another Client G", phone_number="888999000")
-        self.another_client_id = self.another_client.client_id
-        
-        self.test_order = order_manager.add_order(
-            client_id=self.test_client_id,
-            deadline=datetime.now() + timedelta(days=20), # Using datetime for order
-            measurements={"sample_gallery": "data"},
-            style_details="Test Order for Gallery Item"
-        )
-        self.test_order_id = self.test_order.order_id
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the shared clients and orders."""
+        client_manager.clear_clients()
+        order_manager.clear_orders()
 
-        self.another_order = order_manager.add_order(
-            client_id=self.another_client_id,
-            deadline=datetime.now() + timedelta(days=22), # Using datetime for order
-            measurements={},
-            style_details="Another Test Order for Gallery"
-        )
-        self.another_order_id = self.another_order.order_id
+    def setUp(self):
+        """Clear the portfolio items before each test for isolation."""
+        gallery_manager.clear_portfolio_items()
 
     def _create_sample_item_data(self, **kwargs):
         """Helper to create sample portfolio item data with defaults."""
-        data = {
-            "image_path": "path/to/default_image.jpg",
-            "title": "Default Title",
-            "description": "Default description.",
-            "client_id": self.test_client_id,
-            "order_id": self.test_order_id,
-            "style_tags": ["default", "sample"],
-            "is_public": False,
+        return {
+            **self._default_item_data,
+            "style_tags": list(self._default_style_tags),
+            **kwargs,
         }
-        data.update(kwargs)
-        return data
 
     def test_add_portfolio_item(self):
         """Test adding a new portfolio item."""
@@ -74,7 +95,7 @@ class TestGalleryManager(unittest.TestCase):
         self.assertIsInstance(item.upload_date, date) # Model uses date
         self.assertEqual(item.upload_date, date.today())
         
-        self.assertIn(item, gallery_manager.portfolio_items_db)
+        self.assertIn(item.item_id, gallery_manager.portfolio_items_db)
         self.assertEqual(len(gallery_manager.portfolio_items_db), 1)
 
         # Test adding with minimal required field (image_path)
@@ -91,6 +112,17 @@ class TestGalleryManager(unittest.TestCase):
         with self.assertRaises(TypeError): # Missing image_path
             gallery_manager.add_portfolio_item(title="No Image Item")
 
+    def test_add_portfolio_item_with_supplied_id(self):
+        """Test that a supplied item_id is stored as a UUID and checked for duplicates in either form."""
+        own_id = uuid.uuid4()
+        item = gallery_manager.add_portfolio_item(**self._create_sample_item_data(item_id=str(own_id)))
+        self.assertEqual(item.item_id, own_id)
+        self.assertIs(gallery_manager.get_portfolio_item_by_id(own_id), item)
+        for duplicate_id in (own_id, str(own_id)):
+            with self.subTest(duplicate_id=duplicate_id), self.assertRaises(ValueError):
+                gallery_manager.add_portfolio_item(**self._create_sample_item_data(item_id=duplicate_id))
+        self.assertEqual(len(gallery_manager.portfolio_items_db), 1)
+
     def test_get_portfolio_item_by_id(self):
         """Test retrieving a portfolio item by its ID."""
         item1_data = self._create_sample_item_data(image_path="item1.jpg")
@@ -99,8 +131,7 @@ class TestGalleryManager(unittest.TestCase):
         retrieved_item = gallery_manager.get_portfolio_item_by_id(item1.item_id)
         self.assertEqual(retrieved_item, item1)
         
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(gallery_manager.get_portfolio_item_by_id(non_existent_uuid))
+        self.assertIsNone(gallery_manager.get_portfolio_item_by_id(_MISSING_UUID))
         self.assertIsNone(gallery_manager.get_portfolio_item_by_id("not-a-uuid-string"))
 
     def test_get_portfolio_items_for_client(self):
@@ -110,14 +141,10 @@ class TestGalleryManager(unittest.TestCase):
         item3 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(client_id=self.test_client_id, image_path="c1_item2.jpg"))
 
         client1_items = gallery_manager.get_portfolio_items_for_client(self.test_client_id)
-        self.assertEqual(len(client1_items), 2)
-        self.assertIn(item1, client1_items)
-        self.assertIn(item3, client1_items)
-        self.assertNotIn(item2, client1_items)
+        self.assertCountEqual(client1_items, [item1, item3])
         
         # Test with a client_id that has no items
-        yet_another_client_id = uuid.uuid4() 
-        self.assertEqual(gallery_manager.get_portfolio_items_for_client(yet_another_client_id), [])
+        self.assertEqual(gallery_manager.get_portfolio_items_for_client(_MISSING_UUID), [])
 
     def test_get_portfolio_items_for_order(self):
         """Test retrieving portfolio items for a specific order_id."""
@@ -126,41 +153,70 @@ class TestGalleryManager(unittest.TestCase):
         item3 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(order_id=self.test_order_id, image_path="o1_item2.jpg"))
 
         order1_items = gallery_manager.get_portfolio_items_for_order(self.test_order_id)
-        self.assertEqual(len(order1_items), 2)
-        self.assertIn(item1, order1_items)
-        self.assertIn(item3, order1_items)
-        self.assertNotIn(item2, order1_items)
+        self.assertCountEqual(order1_items, [item1, item3])
 
         # Test with an order_id that has no items
-        yet_another_order_id = uuid.uuid4()
-        self.assertEqual(gallery_manager.get_portfolio_items_for_order(yet_another_order_id), [])
+        self.assertEqual(gallery_manager.get_portfolio_items_for_order(_MISSING_UUID), [])
 
     def test_get_portfolio_items_by_tag(self):
         """Test retrieving portfolio items by a specific style_tag."""
+        # Non-string tag (should return empty list as per manager implementation); needs no items
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag(123), [])
+
         item1 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(style_tags=["casual", "shirt"], image_path="tag_item1.jpg"))
         item2 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(style_tags=["formal", "suit"], image_path="tag_item2.jpg"))
         item3 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(style_tags=["casual", "dress"], image_path="tag_item3.jpg"))
         item4 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(style_tags=[], image_path="no_tags.jpg")) # No tags
         item5 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(style_tags=None, image_path="none_tags.jpg")) # Tags is None
 
-        # Test tag "casual"
-        casual_items = gallery_manager.get_portfolio_items_by_tag("casual")
-        self.assertEqual(len(casual_items), 2)
-        self.assertIn(item1, casual_items)
-        self.assertIn(item3, casual_items)
-        self.assertNotIn(item2, casual_items)
-
-        # Test tag "suit"
-        suit_items = gallery_manager.get_portfolio_items_by_tag("suit")
-        self.assertEqual(len(suit_items), 1)
-        self.assertIn(item2, suit_items)
-
-        # Test tag that matches no items
-        non_existent_tag_items = gallery_manager.get_portfolio_items_by_tag("nonexistenttag")
-        self.assertEqual(len(non_existent_tag_items), 0)
-        
-        # Test with non-string tag (should return empty list as per manager implementation)
-        self.assertEqual(gallery_manager.get_portfolio_items_by_tag(123), [])
+        cases = [
+            ("casual", [item1, item3]),
+            ("suit", [item2]),
+            ("nonexistenttag", []), # Matches no items
+        ]
+        for tag, expected in cases:
+            with self.subTest(tag=tag):
+                self.assertCountEqual(gallery_manager.get_portfolio_items_by_tag(tag), expected)
+
+    def test_tag_lookup_follows_updates(self):
+        """Test that tag lookups reflect retagging and deletion."""
+        item = gallery_manager.add_portfolio_item(**self._create_sample_item_data(style_tags=["casual", "shirt"]))
+
+        gallery_manager.update_portfolio_item(item.item_id, style_tags=["formal", "shirt"])
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag("casual"), [])
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag("formal"), [item])
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag("shirt"), [item])
+
+        gallery_manager.delete_portfolio_item(item.item_id)
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag("formal"), [])
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag("shirt"), [])
+
+    def test_lookups_keep_creation_order_after_updates(self):
+        """Test that client, order, tag and public lookups stay in creation order when items are updated."""
+        a, b, c = gallery_manager.bulk_add_portfolio_items([
+            self._create_sample_item_data(image_path=f"{name}.jpg", style_tags=["shirt"], is_public=True) for name in "abc"
+        ])
+
+        # Updates that keep an item's client, order and tags leave it in place
+        gallery_manager.update_portfolio_item(a.item_id, title="Renamed", client_id=self.test_client_id,
+                                              order_id=self.test_order_id, style_tags=["shirt", "linen"])
+        self.assertEqual(gallery_manager.get_portfolio_items_for_client(self.test_client_id), [a, b, c])
+        self.assertEqual(gallery_manager.get_portfolio_items_for_order(self.test_order_id), [a, b, c])
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag("shirt"), [a, b, c])
+
+        # Items moved away and back, retagged or republished return to their place
+        gallery_manager.update_portfolio_item(b.item_id, client_id=self.another_client_id)
+        gallery_manager.update_portfolio_item(b.item_id, client_id=self.test_client_id)
+        self.assertEqual(gallery_manager.get_portfolio_items_for_client(self.test_client_id), [a, b, c])
+        gallery_manager.update_portfolio_item(c.item_id, order_id=self.another_order_id)
+        gallery_manager.update_portfolio_item(a.item_id, order_id=self.another_order_id)
+        self.assertEqual(gallery_manager.get_portfolio_items_for_order(self.another_order_id), [a, c])
+        gallery_manager.update_portfolio_item(a.item_id, style_tags=["linen"])
+        gallery_manager.update_portfolio_item(a.item_id, style_tags=["shirt"])
+        self.assertEqual(gallery_manager.get_portfolio_items_by_tag("shirt"), [a, b, c])
+        gallery_manager.update_portfolio_item(a.item_id, is_public=False)
+        gallery_manager.update_portfolio_item(a.item_id, is_public=True)
+        self.assertEqual(gallery_manager.list_public_portfolio_items(), [a, b, c])
 
     def test_list_all_portfolio_items(self):
         """Test listing all portfolio items."""
@@ -170,9 +226,7 @@ class TestGalleryManager(unittest.TestCase):
         item2 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(image_path="all2.jpg"))
         
         all_items = gallery_manager.list_all_portfolio_items()
-        self.assertEqual(len(all_items), 2)
-        self.assertIn(item1, all_items)
-        self.assertIn(item2, all_items)
+        self.assertCountEqual(all_items, [item1, item2])
 
     def test_list_public_portfolio_items(self):
         """Test listing only public portfolio items."""
@@ -181,15 +235,36 @@ class TestGalleryManager(unittest.TestCase):
         item3 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(is_public=True, image_path="public2.jpg"))
         
         public_items = gallery_manager.list_public_portfolio_items()
-        self.assertEqual(len(public_items), 2)
-        self.assertIn(item1, public_items)
-        self.assertIn(item3, public_items)
-        self.assertNotIn(item2, public_items)
+        self.assertCountEqual(public_items, [item1, item3])
 
         # Test with no public items
-        gallery_manager.portfolio_items_db = [] # Clear
-        gallery_manager.add_portfolio_item(**self._create_sample_item_data(is_public=False, image_path="private_only.jpg"))
+        gallery_manager.clear_portfolio_items() # Clear
+        private_item = gallery_manager.add_portfolio_item(**self._create_sample_item_data(is_public=False, image_path="private_only.jpg"))
+        self.assertEqual(gallery_manager.list_public_portfolio_items(), [])
+
+        # Publishing, unpublishing and deleting are reflected in the listing
+        gallery_manager.update_portfolio_item(private_item.item_id, is_public=True)
+        self.assertEqual(gallery_manager.list_public_portfolio_items(), [private_item])
+        gallery_manager.update_portfolio_item(private_item.item_id, is_public=False)
         self.assertEqual(gallery_manager.list_public_portfolio_items(), [])
+        gallery_manager.update_portfolio_item(private_item.item_id, is_public=True)
+        gallery_manager.delete_portfolio_item(private_item.item_id)
+        self.assertEqual(gallery_manager.list_public_portfolio_items(), [])
+
+    def test_list_public_portfolio_items_for_client(self):
+        """Test listing a client's public items from either side of the intersection."""
+        item1 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(is_public=True, image_path="c1_public.jpg"))
+        gallery_manager.add_portfolio_item(**self._create_sample_item_data(is_public=False, image_path="c1_private.jpg"))
+        item3 = gallery_manager.add_portfolio_item(**self._create_sample_item_data(is_public=True, image_path="c1_public2.jpg"))
+        self.assertEqual(gallery_manager.list_public_portfolio_items_for_client(self.test_client_id), [item1, item3])
+
+        # More public items than the client has, so the client bucket is the smaller side
+        for i in range(3):
+            gallery_manager.add_portfolio_item(**self._create_sample_item_data(
+                client_id=self.another_client_id, is_public=True, image_path=f"c2_public{i}.jpg"))
+        self.assertEqual(gallery_manager.list_public_portfolio_items_for_client(self.test_client_id), [item1, item3])
+        self.assertEqual(len(gallery_manager.list_public_portfolio_items_for_client(self.another_client_id)), 3)
+        self.assertEqual(gallery_manager.list_public_portfolio_items_for_client(_MISSING_UUID), [])
 
     def test_update_portfolio_item(self):
         """Test updating a portfolio item's information."""
@@ -223,8 +298,7 @@ class TestGalleryManager(unittest.TestCase):
         self.assertEqual(updated_item.upload_date, original_upload_date)
 
         # Test updating a non-existent item
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(gallery_manager.update_portfolio_item(non_existent_uuid, title="Ghost Item"))
+        self.assertIsNone(gallery_manager.update_portfolio_item(_MISSING_UUID, title="Ghost Item"))
 
         # Test for ValueError if image_path is updated to an invalid value
         with self.assertRaises(ValueError):
@@ -245,24 +319,17 @@ class TestGalleryManager(unittest.TestCase):
         item = gallery_manager.add_portfolio_item(**item_data)
         item_id_to_delete = item.item_id
         
-        self.assertIn(item, gallery_manager.portfolio_items_db)
+        self.assertIn(item.item_id, gallery_manager.portfolio_items_db)
         
         delete_result = gallery_manager.delete_portfolio_item(item_id_to_delete)
         self.assertTrue(delete_result)
         
-        self.assertNotIn(item, gallery_manager.portfolio_items_db)
+        self.assertNotIn(item.item_id, gallery_manager.portfolio_items_db)
         self.assertIsNone(gallery_manager.get_portfolio_item_by_id(item_id_to_delete))
         
         # Test deleting a non-existent item
-        non_existent_uuid = uuid.uuid4()
-        delete_non_existent_result = gallery_manager.delete_portfolio_item(non_existent_uuid)
+        delete_non_existent_result = gallery_manager.delete_portfolio_item(_MISSING_UUID)
         self.assertFalse(delete_non_existent_result)
 
-    def tearDown(self):
-        """Clean up databases after each test."""
-        gallery_manager.portfolio_items_db = []
-        client_manager.clients_db = []
-        order_manager.orders_db = []
-
 if __name__ == '__main__':
     unittest.main()
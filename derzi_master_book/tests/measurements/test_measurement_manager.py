@@ -11,37 +11,53 @@ from derzi_master_book.clients import client_manager
 from derzi_master_book.orders.models import Order
 from derzi_master_book.orders import order_manager
 
+# An id that is never generated for a stored record, for the not-found cases
+_MISSING_UUID = uuid.UUID(int=0)
+
 class TestMeasurementManager(unittest.TestCase):
 
-    def setUp(self):
-        """Clear databases before each test for isolation."""
-        measurement_manager.measurement_templates_db = []
-        measurement_manager.custom_measurements_db = []
-        client_manager.clients_db = []
-        order_manager.orders_db = []
+    @classmethod
+    def setUpClass(cls):
+        """Create the dummy clients and orders once; the tests only read their ids."""
+        client_manager.clear_clients()
+        order_manager.clear_orders()
+        cls.now = datetime.now() # Read the clock once for every fixture deadline
 
         # Create dummy client and order for use in CustomMeasurement tests
-        self.test_client = client_manager.add_client(name="Test Client M", phone_number="111222333")
-        self.test_client_id = self.test_client.client_id
-
-        self.another_client = client_manager.add_client(name="Another Client M", phone_number="444555666")
-        self.another_client_id = self.another_client.client_id
-        
-        self.test_order = order_manager.add_order(
-            client_id=self.test_client_id,
-            deadline=datetime.now() + timedelta(days=10),
-            measurements={"initial_order_measurement": "value"}, # Can be empty
-            style_details="Test Order Style for Measurements"
-        )
-        self.test_order_id = self.test_order.order_id
+        cls.test_client, cls.another_client = client_manager.bulk_add_clients([
+            {"name": "Test Client M", "phone_number": "111222333"},
+            {"name": "Another Client M", "phone_number": "444555666"},
+        ])
+        cls.test_client_id = cls.test_client.client_id
+        cls.another_client_id = cls.another_client.client_id
+
+        cls.test_order, cls.another_order = order_manager.bulk_add_orders([
+            {
+                "client_id": cls.test_client_id,
+                "deadline": cls.now + timedelta(days=10),
+                "measurements": {"initial_order_measurement": "value"}, # Can be empty
+                "style_details": "Test Order Style for Measurements",
+            },
+            {
+                "client_id": cls.another_client_id,
+                "deadline": cls.now + timedelta(days=12),
+                "measurements": {},
+                "style_details": "Another Test Order",
+            },
+        ])
+        cls.test_order_id = cls.test_order.order_id
+        cls.another_order_id = cls.another_order.order_id
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the shared clients and orders."""
+        client_manager.clear_clients()
+        order_manager.clear_orders()
 
-        self.another_order = order_manager.add_order(
-            client_id=self.another_client_id,
-            deadline=datetime.now() + timedelta(days=12),
-            measurements={},
-            style_details="Another Test Order"
-        )
-        self.another_order_id = self.another_order.order_id
+    def setUp(self):
+        """Clear the measurement templates and custom measurements before each test for isolation."""
+        measurement_manager.clear_measurement_templates()
+        measurement_manager.clear_custom_measurements()
 
     # --- MeasurementTemplate Test Cases ---
     def test_add_measurement_template(self):
@@ -58,7 +74,7 @@ class TestMeasurementManager(unittest.TestCase):
         self.assertIsInstance(template.template_id, uuid.UUID)
         
         self.assertEqual(len(measurement_manager.measurement_templates_db), 1)
-        self.assertEqual(measurement_manager.measurement_templates_db[0], template)
+        self.assertEqual(measurement_manager.measurement_templates_db[template.template_id], template)
 
         # Test adding with minimal required fields
         template2 = measurement_manager.add_measurement_template(name="Basic Pants", fields=["waist", "inseam"])
@@ -80,8 +96,7 @@ class TestMeasurementManager(unittest.TestCase):
         retrieved_template = measurement_manager.get_measurement_template_by_id(template1.template_id)
         self.assertEqual(retrieved_template, template1)
         
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(measurement_manager.get_measurement_template_by_id(non_existent_uuid))
+        self.assertIsNone(measurement_manager.get_measurement_template_by_id(_MISSING_UUID))
         # Test with an invalid UUID format string
         self.assertIsNone(measurement_manager.get_measurement_template_by_id("not-a-valid-uuid"))
 
@@ -93,9 +108,7 @@ class TestMeasurementManager(unittest.TestCase):
         template2 = measurement_manager.add_measurement_template(name="Template B", fields=["b"])
         
         all_templates = measurement_manager.list_all_measurement_templates()
-        self.assertEqual(len(all_templates), 2)
-        self.assertIn(template1, all_templates)
-        self.assertIn(template2, all_templates)
+        self.assertCountEqual(all_templates, [template1, template2])
 
     def test_update_measurement_template(self):
         """Test updating a measurement template's information."""
@@ -115,8 +128,7 @@ class TestMeasurementManager(unittest.TestCase):
         self.assertEqual(updated_template.template_id, original_id)
 
         # Test updating non-existent template
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(measurement_manager.update_measurement_template(non_existent_uuid, name="Ghost"))
+        self.assertIsNone(measurement_manager.update_measurement_template(_MISSING_UUID, name="Ghost"))
         
         # Test invalid updates (e.g., empty name)
         with self.assertRaises(ValueError):
@@ -138,8 +150,7 @@ class TestMeasurementManager(unittest.TestCase):
         self.assertIsNone(measurement_manager.get_measurement_template_by_id(template_id_to_delete))
         
         # Test deleting non-existent template
-        non_existent_uuid = uuid.uuid4()
-        self.assertFalse(measurement_manager.delete_measurement_template(non_existent_uuid))
+        self.assertFalse(measurement_manager.delete_measurement_template(_MISSING_UUID))
 
     # --- CustomMeasurement Test Cases ---
     def test_add_custom_measurement(self):
@@ -160,7 +171,7 @@ class TestMeasurementManager(unittest.TestCase):
         self.assertIsInstance(custom_meas.date_taken, datetime)
         
         self.assertEqual(len(measurement_manager.custom_measurements_db), 1)
-        self.assertEqual(measurement_manager.custom_measurements_db[0], custom_meas)
+        self.assertEqual(measurement_manager.custom_measurements_db[custom_meas.measurement_id], custom_meas)
 
         # Test adding with minimal required fields
         minimal_data = {"neck": "16"}
@@ -181,6 +192,17 @@ class TestMeasurementManager(unittest.TestCase):
             measurement_manager.add_custom_measurement(client_id=self.test_client_id, measurements=minimal_data)
 
 
+    def test_add_custom_measurement_with_supplied_id(self):
+        """Test that a supplied measurement_id is stored as a UUID and checked for duplicates in either form."""
+        own_id = uuid.uuid4()
+        custom_meas = measurement_manager.add_custom_measurement(self.test_order_id, self.test_client_id, {"chest": "42"}, measurement_id=str(own_id))
+        self.assertEqual(custom_meas.measurement_id, own_id)
+        self.assertIs(measurement_manager.get_custom_measurement_by_id(own_id), custom_meas)
+        for duplicate_id in (own_id, str(own_id)):
+            with self.subTest(duplicate_id=duplicate_id), self.assertRaises(ValueError):
+                measurement_manager.add_custom_measurement(self.test_order_id, self.test_client_id, {"chest": "42"}, measurement_id=duplicate_id)
+        self.assertEqual(len(measurement_manager.custom_measurements_db), 1)
+
     def test_get_custom_measurement_by_id(self):
         """Test retrieving a custom measurement by its ID."""
         meas1 = measurement_manager.add_custom_measurement(self.test_order_id, self.test_client_id, {"chest": "38"})
@@ -188,8 +210,7 @@ class TestMeasurementManager(unittest.TestCase):
         retrieved_meas = measurement_manager.get_custom_measurement_by_id(meas1.measurement_id)
         self.assertEqual(retrieved_meas, meas1)
         
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(measurement_manager.get_custom_measurement_by_id(non_existent_uuid))
+        self.assertIsNone(measurement_manager.get_custom_measurement_by_id(_MISSING_UUID))
         self.assertIsNone(measurement_manager.get_custom_measurement_by_id("not-a-uuid-string"))
 
     def test_get_custom_measurements_for_order(self):
@@ -199,32 +220,24 @@ class TestMeasurementManager(unittest.TestCase):
         meas3 = measurement_manager.add_custom_measurement(self.test_order_id, self.test_client_id, {"m3": "v3"})
 
         order1_measurements = measurement_manager.get_custom_measurements_for_order(self.test_order_id)
-        self.assertEqual(len(order1_measurements), 2)
-        self.assertIn(meas1, order1_measurements)
-        self.assertIn(meas3, order1_measurements)
-        self.assertNotIn(meas2, order1_measurements)
+        self.assertCountEqual(order1_measurements, [meas1, meas3])
         
         # Test with an order_id that has no measurements
-        yet_another_order_id = uuid.uuid4()
-        self.assertEqual(measurement_manager.get_custom_measurements_for_order(yet_another_order_id), [])
+        self.assertEqual(measurement_manager.get_custom_measurements_for_order(_MISSING_UUID), [])
 
     def test_get_custom_measurements_for_client(self):
         """Test retrieving custom measurements for a specific client_id."""
         meas1 = measurement_manager.add_custom_measurement(self.test_order_id, self.test_client_id, {"c1m1": "v1"})
         meas2 = measurement_manager.add_custom_measurement(self.another_order_id, self.another_client_id, {"c2m1": "v2"})
         # Another measurement for the first client, but different order
-        meas3_order = order_manager.add_order(self.test_client_id, datetime.now(), {}, "Order for meas3")
+        meas3_order = order_manager.add_order(self.test_client_id, self.now, {}, "Order for meas3")
         meas3 = measurement_manager.add_custom_measurement(meas3_order.order_id, self.test_client_id, {"c1m2": "v3"})
 
         client1_measurements = measurement_manager.get_custom_measurements_for_client(self.test_client_id)
-        self.assertEqual(len(client1_measurements), 2)
-        self.assertIn(meas1, client1_measurements)
-        self.assertIn(meas3, client1_measurements)
-        self.assertNotIn(meas2, client1_measurements)
+        self.assertCountEqual(client1_measurements, [meas1, meas3])
 
         # Test with a client_id that has no measurements
-        yet_another_client_id = uuid.uuid4()
-        self.assertEqual(measurement_manager.get_custom_measurements_for_client(yet_another_client_id), [])
+        self.assertEqual(measurement_manager.get_custom_measurements_for_client(_MISSING_UUID), [])
 
     def test_update_custom_measurement(self):
         """Test updating a custom measurement's information."""
@@ -253,8 +266,7 @@ class TestMeasurementManager(unittest.TestCase):
         self.assertEqual(updated_custom_meas.client_id, original_client_id)
 
         # Test updating non-existent custom measurement
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(measurement_manager.update_custom_measurement(non_existent_uuid, notes="Ghost notes"))
+        self.assertIsNone(measurement_manager.update_custom_measurement(_MISSING_UUID, notes="Ghost notes"))
 
         # Test ValueError for invalid measurements
         with self.assertRaises(ValueError):
@@ -276,15 +288,7 @@ class TestMeasurementManager(unittest.TestCase):
         self.assertIsNone(measurement_manager.get_custom_measurement_by_id(measurement_id_to_delete))
         
         # Test deleting non-existent custom measurement
-        non_existent_uuid = uuid.uuid4()
-        self.assertFalse(measurement_manager.delete_custom_measurement(non_existent_uuid))
-
-    def tearDown(self):
-        """Clean up databases after each test."""
-        measurement_manager.measurement_templates_db = []
-        measurement_manager.custom_measurements_db = []
-        client_manager.clients_db = []
-        order_manager.orders_db = []
+        self.assertFalse(measurement_manager.delete_custom_measurement(_MISSING_UUID))
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,40 +1,61 @@
 import unittest
 import uuid
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 from derzi_master_book.orders.models import Order
 from derzi_master_book.orders import order_manager
 from derzi_master_book.clients.models import Client
 from derzi_master_book.clients import client_manager
 
+# An id that is never generated for a stored record, for the not-found cases
+_MISSING_UUID = uuid.UUID(int=0)
+
+# Sample order defaults; the mutable ones are copied for every order
+_DEADLINE_DELTA = timedelta(days=7)
+_DEFAULT_MEASUREMENTS = {"chest": "40", "waist": "32"}
+_DEFAULT_ATTACHMENTS = ("ref1.jpg",)
+
 class TestOrderManager(unittest.TestCase):
 
-    def setUp(self):
-        """Clear the orders_db and clients_db before each test for isolation."""
-        order_manager.orders_db = []
-        client_manager.clients_db = [] # Manage client_db state as well
-        
-        # Create a dummy client for use in tests
-        self.test_client = client_manager.add_client(name="Test Client User", phone_number="1234567890")
-        self.test_client_id = self.test_client.client_id
+    @classmethod
+    def setUpClass(cls):
+        """Create the dummy clients once; the order tests only read their ids."""
+        client_manager.clear_clients()
+
+        cls.test_client, cls.another_client = client_manager.bulk_add_clients([
+            {"name": "Test Client User", "phone_number": "1234567890"},
+            {"name": "Another Client User", "phone_number": "0987654321"},
+        ])
+        cls.test_client_id = cls.test_client.client_id
+        cls.another_client_id = cls.another_client.client_id
 
-        self.another_client = client_manager.add_client(name="Another Client User", phone_number="0987654321")
-        self.another_client_id = self.another_client.client_id
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the shared clients."""
+        client_manager.clear_clients()
 
+    def setUp(self):
+        """Clear the orders_db before each test for isolation."""
+        order_manager.clear_orders()
+        self.now = datetime.now() # Read the clock once; the test's deadlines are derived from it
 
     def _create_sample_order_data(self, client_id=None, **kwargs):
         """Helper to create sample order data with defaults."""
-        data = {
+        return {
             "client_id": client_id if client_id else self.test_client_id,
-            "deadline": datetime.now() + timedelta(days=7),
-            "measurements": {"chest": "40", "waist": "32"},
+            "deadline": self.now + _DEADLINE_DELTA,
+            "measurements": dict(_DEFAULT_MEASUREMENTS), # Copied so orders never share them
             "style_details": "Slim fit shirt",
-            "attachments": ["ref1.jpg"],
+            "attachments": list(_DEFAULT_ATTACHMENTS),
             "price": 150.00, # Assuming price is float/Decimal compatible
-            "status": Order.STATUS_PENDING
+            "status": Order.STATUS_PENDING,
+            **kwargs,
         }
-        data.update(kwargs)
-        return data
+
+    def _assert_money_equal(self, actual, expected):
+        """Compares two amounts by their decimal value, whether they are floats or Decimals."""
+        self.assertEqual(Decimal(str(actual)), Decimal(str(expected)))
 
     def test_add_order(self):
         """Test adding a new order."""
@@ -48,18 +69,18 @@ class TestOrderManager(unittest.TestCase):
         self.assertEqual(order.measurements, sample_data["measurements"])
         self.assertEqual(order.style_details, sample_data["style_details"])
         self.assertEqual(order.attachments, sample_data["attachments"])
-        self.assertEqual(float(order.price), sample_data["price"]) # Compare as float if model stores Decimal
+        self._assert_money_equal(order.price, sample_data["price"])
         self.assertEqual(order.status, Order.STATUS_PENDING) # Default status
         self.assertIsInstance(order.order_id, uuid.UUID)
         self.assertIsInstance(order.order_date, datetime)
         
         self.assertEqual(len(order_manager.orders_db), 1)
-        self.assertEqual(order_manager.orders_db[0], order)
+        self.assertEqual(order_manager.orders_db[order.order_id], order)
 
         # Test adding an order with minimal required fields (assuming model defaults some)
         minimal_data = {
             "client_id": self.test_client_id,
-            "deadline": datetime.now() + timedelta(days=3),
+            "deadline": self.now + timedelta(days=3),
             "measurements": {"neck": "15"},
             "style_details": "Basic T-shirt"
         }
@@ -77,7 +98,18 @@ class TestOrderManager(unittest.TestCase):
         with self.assertRaises(TypeError):
             order_manager.add_order(client_id=self.test_client_id, measurements={}, style_details="Test") # Missing deadline
         with self.assertRaises(TypeError):
-            order_manager.add_order(deadline=datetime.now(), measurements={}, style_details="Test") # Missing client_id
+            order_manager.add_order(deadline=self.now, measurements={}, style_details="Test") # Missing client_id
+
+    def test_add_order_with_supplied_id(self):
+        """Test that a supplied order_id is stored as a UUID and checked for duplicates in either form."""
+        own_id = uuid.uuid4()
+        order = order_manager.add_order(**self._create_sample_order_data(order_id=str(own_id)))
+        self.assertEqual(order.order_id, own_id)
+        self.assertIs(order_manager.get_order_by_id(own_id), order)
+        for duplicate_id in (own_id, str(own_id)):
+            with self.subTest(duplicate_id=duplicate_id), self.assertRaises(ValueError):
+                order_manager.add_order(**self._create_sample_order_data(order_id=duplicate_id))
+        self.assertEqual(len(order_manager.orders_db), 1)
 
     def test_get_order_by_id(self):
         """Test retrieving an order by its ID."""
@@ -87,8 +119,7 @@ class TestOrderManager(unittest.TestCase):
         retrieved_order = order_manager.get_order_by_id(order1.order_id)
         self.assertEqual(retrieved_order, order1)
         
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(order_manager.get_order_by_id(non_existent_uuid))
+        self.assertIsNone(order_manager.get_order_by_id(_MISSING_UUID))
         # Assuming get_order_by_id does not strictly validate UUID format, just won't find it
         self.assertIsNone(order_manager.get_order_by_id("not-a-uuid"))
 
@@ -103,14 +134,18 @@ class TestOrderManager(unittest.TestCase):
         order3 = order_manager.add_order(**order3_data)
 
         client1_orders = order_manager.list_orders_by_client(self.test_client_id)
-        self.assertEqual(len(client1_orders), 2)
-        self.assertIn(order1, client1_orders)
-        self.assertIn(order3, client1_orders)
-        self.assertNotIn(order2, client1_orders)
-        
+        self.assertCountEqual(client1_orders, [order1, order3])
+
+        # Client ids given as strings, or as values that are not UUIDs, share the same keys
+        order4 = order_manager.add_order(**self._create_sample_order_data(client_id=str(self.another_client_id)))
+        self.assertEqual(order_manager.list_orders_by_client(self.another_client_id), [order2, order4])
+        legacy_order = order_manager.add_order(**self._create_sample_order_data(client_id=["legacy"]))
+        self.assertEqual(order_manager.list_orders_by_client(["legacy"]), [legacy_order])
+        self.assertTrue(order_manager.delete_order(legacy_order.order_id))
+        self.assertEqual(order_manager.list_orders_by_client(["legacy"]), [])
+
         # Test with a client_id that has no orders
-        yet_another_client_id = uuid.uuid4() # Non-existent client for orders
-        self.assertEqual(order_manager.list_orders_by_client(yet_another_client_id), [])
+        self.assertEqual(order_manager.list_orders_by_client(_MISSING_UUID), [])
 
     def test_list_all_orders(self):
         """Test listing all orders."""
@@ -123,9 +158,7 @@ class TestOrderManager(unittest.TestCase):
         order2 = order_manager.add_order(**order2_data)
         
         all_orders = order_manager.list_all_orders()
-        self.assertEqual(len(all_orders), 2)
-        self.assertIn(order1, all_orders)
-        self.assertIn(order2, all_orders)
+        self.assertCountEqual(all_orders, [order1, order2])
 
     def test_update_order_status(self):
         """Test updating an order's status."""
@@ -140,13 +173,13 @@ class TestOrderManager(unittest.TestCase):
         # Test updating to an invalid status string
         no_change_order = order_manager.update_order_status(original_order_id, "INVALID_STATUS_XYZ")
         self.assertIsNone(no_change_order) # order_manager.update_order_status returns None for invalid status
+        self.assertIsNone(order_manager.update_order_status(original_order_id, [Order.STATUS_DELIVERED])) # Unhashable
         # Verify status did not change
         current_order = order_manager.get_order_by_id(original_order_id)
         self.assertEqual(current_order.status, Order.STATUS_IN_PROGRESS) 
 
         # Test updating status for a non-existent order
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(order_manager.update_order_status(non_existent_uuid, Order.STATUS_DELIVERED))
+        self.assertIsNone(order_manager.update_order_status(_MISSING_UUID, Order.STATUS_DELIVERED))
 
     def test_update_order_details(self):
         """Test updating an order's details."""
@@ -155,7 +188,7 @@ class TestOrderManager(unittest.TestCase):
         original_order_id = order.order_id
         original_order_date = order.order_date # Should not change
 
-        new_deadline = datetime.now() + timedelta(days=10)
+        new_deadline = self.now + timedelta(days=10)
         new_measurements = {"shoulder": "18", "sleeve": "25"}
         new_style = "Double-breasted suit"
         new_price = 250.75
@@ -171,7 +204,7 @@ class TestOrderManager(unittest.TestCase):
         self.assertEqual(updated_order.deadline, new_deadline)
         self.assertEqual(updated_order.measurements, new_measurements)
         self.assertEqual(updated_order.style_details, new_style)
-        self.assertEqual(float(updated_order.price), new_price)
+        self._assert_money_equal(updated_order.price, new_price)
         self.assertEqual(updated_order.order_date, original_order_date) # Ensure order_date didn't change
 
         # Test updating only one attribute (e.g., attachments)
@@ -185,8 +218,7 @@ class TestOrderManager(unittest.TestCase):
         self.assertEqual(further_updated_order.style_details, new_style) # Check previous update persists
 
         # Test updating a non-existent order
-        non_existent_uuid = uuid.uuid4()
-        self.assertIsNone(order_manager.update_order_details(non_existent_uuid, style_details="Ghost Order"))
+        self.assertIsNone(order_manager.update_order_details(_MISSING_UUID, style_details="Ghost Order"))
         
         # Test updating deadline to invalid type
         with self.assertRaises(ValueError):
@@ -207,14 +239,12 @@ class TestOrderManager(unittest.TestCase):
         self.assertIsNone(order_manager.get_order_by_id(order_id_to_delete))
         
         # Test deleting a non-existent order
-        non_existent_uuid = uuid.uuid4()
-        delete_non_existent_result = order_manager.delete_order(non_existent_uuid)
+        delete_non_existent_result = order_manager.delete_order(_MISSING_UUID)
         self.assertFalse(delete_non_existent_result)
 
     def tearDown(self):
-        """Clean up databases after each test."""
-        order_manager.orders_db = []
-        client_manager.clients_db = []
+        """Clean up the orders after each test."""
+        order_manager.clear_orders()
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,38 +1,60 @@
 import unittest
+from unittest import mock
 import os
 import json
-import shutil # For cleaning up the data directory if needed, though file deletion should suffice
+import shutil
+import tempfile
 
 from derzi_master_book.settings.models import AppSettings
 from derzi_master_book.settings import settings_manager
 
+# Settings file contents for the load tests, serialized once at import
+_CUSTOM_SETTINGS_DATA = {
+    "theme": AppSettings.THEME_DARK,
+    "language": AppSettings.LANG_TURKISH,
+    "backup_enabled": True,
+    "backup_location": "/test/backup",
+    "sync_frequency_hours": 12
+}
+_CUSTOM_SETTINGS_JSON = json.dumps(_CUSTOM_SETTINGS_DATA).encode()
+_INVALID_JSON = b"this is not valid json"
+
 class TestSettingsManager(unittest.TestCase):
 
-    def setUp(self):
-        """Set up a temporary test settings file and override the manager's path."""
-        self.test_data_dir = "derzi_master_book/data" # Ensure this exists from previous steps
-        self.test_settings_file = os.path.join(self.test_data_dir, "test_app_settings.json")
-        
-        # Store original path and current_settings state
-        self.original_settings_file_path = settings_manager.SETTINGS_FILE_PATH
-        self.original_current_settings = settings_manager.current_settings
+    @classmethod
+    def setUpClass(cls):
+        """Point the manager at a settings file in a temporary directory for the whole class."""
+        # A temporary directory, so the tests never touch the project's data directory
+        cls.test_data_dir = tempfile.mkdtemp(prefix="derzi_settings_test_")
+        cls.addClassCleanup(shutil.rmtree, cls.test_data_dir, ignore_errors=True)
+        cls.test_settings_file = os.path.join(cls.test_data_dir, "test_app_settings.json")
 
-        # Override with test path
-        settings_manager.SETTINGS_FILE_PATH = self.test_settings_file
-        settings_manager.current_settings = None # Reset to ensure it loads from the new path
+        # Override the manager's path and loaded state; each patch is undone once the class is done
+        for attribute, value in [("SETTINGS_FILE_PATH", cls.test_settings_file), ("current_settings", None), ("_loaded_file_key", None)]:
+            patcher = mock.patch.object(settings_manager, attribute, value)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
 
-        # Clean up any existing test file before each test
-        if os.path.exists(self.test_settings_file):
-            os.remove(self.test_settings_file)
+        # The defaults the load tests compare against; the tests only read it
+        cls._default_settings = AppSettings()
 
-    def tearDown(self):
-        """Clean up the test settings file and restore original manager state."""
-        if os.path.exists(self.test_settings_file):
+    def setUp(self):
+        """Remove the test settings file and reset current_settings before each test."""
+        settings_manager.current_settings = None # Reset to ensure it loads from the test file
+        try:
             os.remove(self.test_settings_file)
-        
-        # Restore original path and settings state
-        settings_manager.SETTINGS_FILE_PATH = self.original_settings_file_path
-        settings_manager.current_settings = self.original_current_settings # Or None, depending on desired global state after tests
+        except FileNotFoundError:
+            pass
+
+    def _read_settings_file(self):
+        """Returns the parsed contents of the test settings file."""
+        with open(self.test_settings_file, 'rb') as f:
+            return json.loads(f.read())
+
+    def _write_settings_file(self, payload):
+        """Replaces the test settings file's contents with the given bytes in a single write."""
+        with open(self.test_settings_file, 'wb') as f:
+            f.write(payload)
 
     def test_load_settings_new_file(self):
         """Test loading settings when the settings file does not exist."""
@@ -44,55 +66,47 @@ class TestSettingsManager(unittest.TestCase):
         self.assertIsInstance(loaded_settings, AppSettings)
         
         # Check default values
-        default_app_settings = AppSettings()
-        self.assertEqual(loaded_settings.theme, default_app_settings.theme)
-        self.assertEqual(loaded_settings.language, default_app_settings.language)
-        self.assertEqual(loaded_settings.backup_enabled, default_app_settings.backup_enabled)
-        self.assertIsNone(loaded_settings.backup_location) # Default is None
-        self.assertIsNone(loaded_settings.sync_frequency_hours) # Default is None
+        self.assertEqual(loaded_settings.to_dict(), self._default_settings.to_dict())
 
         # Verify the file content matches default settings
-        with open(self.test_settings_file, 'r') as f:
-            data_from_file = json.load(f)
-        self.assertEqual(data_from_file["theme"], default_app_settings.theme)
+        self.assertEqual(self._read_settings_file(), self._default_settings.to_dict())
 
     def test_load_settings_existing_file(self):
         """Test loading settings from an existing, valid settings file."""
-        custom_settings_data = {
-            "theme": AppSettings.THEME_DARK,
-            "language": AppSettings.LANG_TURKISH,
-            "backup_enabled": True,
-            "backup_location": "/test/backup",
-            "sync_frequency_hours": 12
-        }
-        with open(self.test_settings_file, 'w') as f:
-            json.dump(custom_settings_data, f)
+        self._write_settings_file(_CUSTOM_SETTINGS_JSON)
             
         loaded_settings = settings_manager.load_settings()
         
-        self.assertEqual(loaded_settings.theme, custom_settings_data["theme"])
-        self.assertEqual(loaded_settings.language, custom_settings_data["language"])
-        self.assertEqual(loaded_settings.backup_enabled, custom_settings_data["backup_enabled"])
-        self.assertEqual(loaded_settings.backup_location, custom_settings_data["backup_location"])
-        self.assertEqual(loaded_settings.sync_frequency_hours, custom_settings_data["sync_frequency_hours"])
+        # The file has no settings_id, so the default one is used
+        self.assertEqual(loaded_settings.to_dict(), {**_CUSTOM_SETTINGS_DATA, "settings_id": AppSettings.DEFAULT_SETTINGS_ID})
+        # Strings parsed from the file are interned to the shared constants
+        self.assertIs(loaded_settings.theme, AppSettings.THEME_DARK)
+        self.assertIs(loaded_settings.language, AppSettings.LANG_TURKISH)
 
     def test_load_settings_invalid_json_file(self):
         """Test loading settings when the file contains invalid JSON."""
-        with open(self.test_settings_file, 'w') as f:
-            f.write("this is not valid json")
+        self._write_settings_file(_INVALID_JSON)
             
         loaded_settings = settings_manager.load_settings() # Should handle error and use defaults
         
         self.assertTrue(os.path.exists(self.test_settings_file)) # File should be overwritten with defaults
-        default_app_settings = AppSettings()
-        self.assertEqual(loaded_settings.theme, default_app_settings.theme)
-        self.assertEqual(loaded_settings.language, default_app_settings.language)
+        self.assertEqual(loaded_settings.theme, self._default_settings.theme)
+        self.assertEqual(loaded_settings.language, self._default_settings.language)
 
         # Verify the file content is now default settings
-        with open(self.test_settings_file, 'r') as f:
-            data_from_file = json.load(f)
-        self.assertEqual(data_from_file["theme"], default_app_settings.theme)
+        data_from_file = self._read_settings_file()
+        self.assertEqual(data_from_file["theme"], self._default_settings.theme)
+
+
+    def test_load_settings_wrong_value_types_in_file(self):
+        """Test that theme and language values of the wrong type fall back to the defaults."""
+        self._write_settings_file(json.dumps({"theme": ["dark"], "language": {"code": "tr"}, "backup_enabled": True}).encode())
+
+        loaded_settings = settings_manager.load_settings()
 
+        self.assertEqual(loaded_settings.theme, self._default_settings.theme)
+        self.assertEqual(loaded_settings.language, self._default_settings.language)
+        self.assertTrue(loaded_settings.backup_enabled) # Valid values in the same file are kept
 
     def test_save_settings(self):
         """Test saving settings to the file."""
@@ -105,13 +119,27 @@ class TestSettingsManager(unittest.TestCase):
         settings_manager.save_settings()
         
         # Read the file directly and verify content
-        with open(self.test_settings_file, 'r') as f:
-            saved_data = json.load(f)
+        saved_data = self._read_settings_file()
             
         self.assertEqual(saved_data["theme"], AppSettings.THEME_DARK)
         self.assertEqual(saved_data["language"], AppSettings.LANG_FRENCH)
         self.assertEqual(saved_data["settings_id"], AppSettings.DEFAULT_SETTINGS_ID) # Ensure ID is saved
 
+    def test_load_settings_reparses_only_changed_file(self):
+        """Test that an unchanged settings file is not parsed again, but a changed one is."""
+        first = settings_manager.load_settings() # Initializes file with defaults
+        self.assertIs(settings_manager.load_settings(), first)
+        self.assertFalse(os.path.exists(self.test_settings_file + ".tmp"))
+
+        self._write_settings_file(json.dumps({"theme": AppSettings.THEME_DARK, "language": AppSettings.LANG_FRENCH}).encode())
+        stat_result = os.stat(self.test_settings_file)
+        os.utime(self.test_settings_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+
+        reloaded = settings_manager.load_settings()
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(reloaded.theme, AppSettings.THEME_DARK)
+        self.assertEqual(reloaded.language, AppSettings.LANG_FRENCH)
+
     def test_get_settings(self):
         """Test the get_settings function for loading and returning the same instance."""
         settings_instance1 = settings_manager.get_settings()
@@ -132,90 +160,84 @@ class TestSettingsManager(unittest.TestCase):
         self.assertEqual(settings_manager.current_settings.theme, AppSettings.THEME_LIGHT)
         
         # Verify change is saved to file
-        with open(self.test_settings_file, 'r') as f:
-            data_from_file = json.load(f)
+        data_from_file = self._read_settings_file()
         self.assertEqual(data_from_file["theme"], AppSettings.THEME_LIGHT)
 
-        # Test updating language
-        settings_manager.update_setting("language", AppSettings.LANG_TURKISH)
-        self.assertEqual(settings_manager.current_settings.language, AppSettings.LANG_TURKISH)
-        with open(self.test_settings_file, 'r') as f:
-            data_from_file = json.load(f)
-        self.assertEqual(data_from_file["language"], AppSettings.LANG_TURKISH)
-
-        # Test updating with an invalid key
-        no_change_settings = settings_manager.update_setting("non_existent_key", "some_value")
-        self.assertIsNone(no_change_settings, "update_setting should return None for invalid key")
-        # Ensure other settings didn't change unexpectedly
-        self.assertEqual(settings_manager.current_settings.language, AppSettings.LANG_TURKISH)
-
-
-        # Test updating with an invalid value for a valid key
-        # Manager's update_setting returns None if validation fails (e.g. theme not in VALID_THEMES)
-        invalid_update_result = settings_manager.update_setting("theme", "invalid_theme_value")
-        self.assertIsNone(invalid_update_result)
-        # Theme should remain as it was (LIGHT from earlier update)
-        self.assertEqual(settings_manager.current_settings.theme, AppSettings.THEME_LIGHT)
-        with open(self.test_settings_file, 'r') as f:
-            data_from_file = json.load(f)
+        # The remaining updates are checked through a spy on save_settings; the writes still happen
+        with mock.patch.object(settings_manager, "save_settings", wraps=settings_manager.save_settings) as save_spy:
+            # Test updating language
+            settings_manager.update_setting("language", AppSettings.LANG_TURKISH)
+            self.assertEqual(settings_manager.current_settings.language, AppSettings.LANG_TURKISH)
+            save_spy.assert_called_once_with()
+
+            # Test updating with an invalid key
+            no_change_settings = settings_manager.update_setting("non_existent_key", "some_value")
+            self.assertIsNone(no_change_settings, "update_setting should return None for invalid key")
+            # Ensure other settings didn't change unexpectedly
+            self.assertEqual(settings_manager.current_settings.language, AppSettings.LANG_TURKISH)
+
+            # Test updating with an invalid value for a valid key
+            # Manager's update_setting returns None if validation fails (e.g. theme not in VALID_THEMES)
+            invalid_update_result = settings_manager.update_setting("theme", "invalid_theme_value")
+            self.assertIsNone(invalid_update_result)
+            # Theme should remain as it was (LIGHT from earlier update)
+            self.assertEqual(settings_manager.current_settings.theme, AppSettings.THEME_LIGHT)
+
+            # Type checks apply to the other validated keys as well
+            self.assertIsNone(settings_manager.update_setting("backup_enabled", "yes"))
+            self.assertIsNone(settings_manager.update_setting("backup_location", 42))
+            self.assertIsNone(settings_manager.update_setting("sync_frequency_hours", "daily"))
+            # Unhashable values are rejected like any other invalid value
+            self.assertIsNone(settings_manager.update_setting("language", {}))
+            self.assertIsNone(settings_manager.update_setting("theme", [AppSettings.THEME_DARK]))
+            self.assertIsNotNone(settings_manager.update_setting("backup_location", None))
+
+            # Re-applying the current value does not rewrite the file
+            self.assertIs(settings_manager.update_setting("theme", AppSettings.THEME_LIGHT), settings_manager.current_settings)
+
+            # Rejected and unchanged updates never saved
+            self.assertEqual(save_spy.call_count, 1)
+
+        # The file holds the valid updates only
+        data_from_file = self._read_settings_file()
         self.assertEqual(data_from_file["theme"], AppSettings.THEME_LIGHT) # Not changed to invalid
+        self.assertEqual(data_from_file["language"], AppSettings.LANG_TURKISH)
 
     def test_convenience_getters_setters(self):
         """Test all convenience getter and setter methods."""
         settings_manager.load_settings() # Load initial default settings
 
-        # Theme
-        settings_manager.set_theme(AppSettings.THEME_DARK)
+        # (setter, getter, valid value, invalid value, settings key); an invalid value must not change the setting
+        cases = [
+            (settings_manager.set_theme, settings_manager.get_theme, AppSettings.THEME_DARK, "invalid_one", "theme"),
+            (settings_manager.set_language, settings_manager.get_language, AppSettings.LANG_FRENCH, "xx", "language"),
+            (settings_manager.set_backup_enabled, settings_manager.is_backup_enabled, True, "not-a-bool", "backup_enabled"),
+            (settings_manager.set_backup_location, settings_manager.get_backup_location, "/my/test/backup/path", 12345, "backup_location"),
+            (settings_manager.set_sync_frequency, settings_manager.get_sync_frequency, 24, "not-an-int", "sync_frequency_hours"),
+        ]
+        for setter, getter, valid_value, invalid_value, key in cases:
+            with self.subTest(key=key):
+                setter(valid_value)
+                self.assertEqual(getter(), valid_value)
+                self.assertEqual(getattr(settings_manager.current_settings, key), valid_value)
+                setter(invalid_value)
+                self.assertEqual(getter(), valid_value) # Should not change
+
+        # Unhashable values are rejected by the setters too
+        settings_manager.set_theme([AppSettings.THEME_LIGHT])
         self.assertEqual(settings_manager.get_theme(), AppSettings.THEME_DARK)
-        self.assertEqual(settings_manager.current_settings.theme, AppSettings.THEME_DARK)
-        with open(self.test_settings_file, 'r') as f: data = json.load(f)
-        self.assertEqual(data["theme"], AppSettings.THEME_DARK)
-        # Invalid theme through setter
-        settings_manager.set_theme("invalid_one")
-        self.assertEqual(settings_manager.get_theme(), AppSettings.THEME_DARK) # Should not change
-
-        # Language
-        settings_manager.set_language(AppSettings.LANG_FRENCH)
+        settings_manager.set_language({})
         self.assertEqual(settings_manager.get_language(), AppSettings.LANG_FRENCH)
-        with open(self.test_settings_file, 'r') as f: data = json.load(f)
-        self.assertEqual(data["language"], AppSettings.LANG_FRENCH)
-        # Invalid language through setter
-        settings_manager.set_language("xx")
-        self.assertEqual(settings_manager.get_language(), AppSettings.LANG_FRENCH) # Should not change
-
-        # Backup Enabled
-        settings_manager.set_backup_enabled(True)
-        self.assertTrue(settings_manager.is_backup_enabled())
-        with open(self.test_settings_file, 'r') as f: data = json.load(f)
-        self.assertTrue(data["backup_enabled"])
-        # Invalid type for backup_enabled
-        settings_manager.set_backup_enabled("not-a-bool")
-        self.assertTrue(settings_manager.is_backup_enabled()) # Should not change
-
-        # Backup Location
-        test_backup_path = "/my/test/backup/path"
-        settings_manager.set_backup_location(test_backup_path)
-        self.assertEqual(settings_manager.get_backup_location(), test_backup_path)
-        with open(self.test_settings_file, 'r') as f: data = json.load(f)
-        self.assertEqual(data["backup_location"], test_backup_path)
-        # Invalid type for backup_location
-        settings_manager.set_backup_location(12345)
-        self.assertEqual(settings_manager.get_backup_location(), test_backup_path) # Should not change
-
-        # Sync Frequency
-        test_sync_freq = 24
-        settings_manager.set_sync_frequency(test_sync_freq)
-        self.assertEqual(settings_manager.get_sync_frequency(), test_sync_freq)
-        with open(self.test_settings_file, 'r') as f: data = json.load(f)
-        self.assertEqual(data["sync_frequency_hours"], test_sync_freq)
-        # Invalid type for sync_frequency
-        settings_manager.set_sync_frequency("not-an-int")
-        self.assertEqual(settings_manager.get_sync_frequency(), test_sync_freq) # Should not change
+
+        # Every valid value was saved to the file
+        data = self._read_settings_file()
+        for _, _, valid_value, _, key in cases:
+            self.assertEqual(data[key], valid_value)
         
         # Set sync frequency to None
         settings_manager.set_sync_frequency(None)
         self.assertIsNone(settings_manager.get_sync_frequency())
-        with open(self.test_settings_file, 'r') as f: data = json.load(f)
+        data = self._read_settings_file()
         self.assertIsNone(data["sync_frequency_hours"])
 
 
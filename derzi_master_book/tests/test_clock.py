@@ -0,0 +1,31 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from derzi_master_book import clock
+
+class TestClock(unittest.TestCase):
+
+    def test_coarse_now_tracks_wall_clock(self):
+        """Test that coarse_now stays within a millisecond of datetime.now()."""
+        before = datetime.now()
+        now = clock.coarse_now()
+        after = datetime.now()
+        self.assertIsInstance(now, datetime)
+        self.assertLessEqual(before - timedelta(milliseconds=1), now)
+        self.assertLessEqual(now, after)
+
+    def test_coarse_now_reuses_value_within_a_millisecond(self):
+        """Test that calls in the same millisecond share a value and later calls refresh it."""
+        with mock.patch.object(clock.time, "time", return_value=1_700_000_000.0):
+            first = clock.coarse_now()
+        with mock.patch.object(clock.time, "time", return_value=1_700_000_000.0005):
+            self.assertIs(clock.coarse_now(), first)
+        with mock.patch.object(clock.time, "time", return_value=1_700_000_000.002):
+            self.assertGreater(clock.coarse_now(), first)
+        # A clock that steps backwards must not keep serving the newer cached value
+        with mock.patch.object(clock.time, "time", return_value=1_600_000_000.0):
+            self.assertLess(clock.coarse_now(), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import uuid
+
+from derzi_master_book.ids import normalize_id, id_key, new_uuids, to_uuid
+
+class TestIds(unittest.TestCase):
+
+    def test_to_uuid(self):
+        """Test UUID coercion, including repeated (cached) lookups and invalid input."""
+        some_uuid = uuid.uuid4()
+        self.assertIs(to_uuid(some_uuid), some_uuid)
+        self.assertEqual(to_uuid(str(some_uuid)), some_uuid)
+        self.assertEqual(to_uuid(str(some_uuid)), some_uuid)
+        with self.assertRaises(ValueError):
+            to_uuid("not-a-uuid")
+        with self.assertRaises(ValueError):
+            to_uuid(["unhashable"])
+
+    def test_new_uuids(self):
+        """Test batch UUID generation."""
+        ids = new_uuids(50)
+        self.assertEqual(len(ids), 50)
+        self.assertEqual(len(set(ids)), 50)
+        for generated in ids:
+            self.assertIsInstance(generated, uuid.UUID)
+            self.assertEqual(generated.version, 4)
+            self.assertEqual(generated.variant, uuid.RFC_4122)
+        self.assertEqual(new_uuids(0), [])
+
+    def test_normalize_id(self):
+        """Test that UUID-like ids become uuid.UUID and everything else passes through."""
+        some_uuid = uuid.uuid4()
+        self.assertIs(normalize_id(some_uuid), some_uuid)
+        self.assertEqual(normalize_id(str(some_uuid)), some_uuid)
+        self.assertEqual(normalize_id(str(some_uuid).upper()), some_uuid)
+        self.assertIsNone(normalize_id(None))
+        self.assertEqual(normalize_id("not-a-uuid"), "not-a-uuid")
+        self.assertEqual(normalize_id(42), 42)
+
+    def test_id_key(self):
+        """Test that index keys compare non-UUID ids as strings."""
+        some_uuid = uuid.uuid4()
+        self.assertEqual(id_key(str(some_uuid)), some_uuid)
+        self.assertIsNone(id_key(None))
+        self.assertEqual(id_key(42), id_key("42"))
+
+if __name__ == '__main__':
+    unittest.main()
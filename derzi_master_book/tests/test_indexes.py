@@ -0,0 +1,22 @@
+import unittest
+
+from derzi_master_book.indexes import add_in_creation_order
+
+class TestIndexes(unittest.TestCase):
+
+    def test_add_in_creation_order(self):
+        """Test that records go back to their creation position and re-adding is a no-op."""
+        creation_order = {"a": 0, "b": 1, "c": 2}
+        bucket = {}
+        add_in_creation_order(bucket, "a", "A", creation_order)
+        add_in_creation_order(bucket, "c", "C", creation_order)
+        self.assertEqual(list(bucket.items()), [("a", "A"), ("c", "C")])
+
+        add_in_creation_order(bucket, "b", "B", creation_order)
+        self.assertEqual(list(bucket), ["a", "b", "c"])
+
+        add_in_creation_order(bucket, "a", "A", creation_order)
+        self.assertEqual(list(bucket), ["a", "b", "c"])
+
+if __name__ == '__main__':
+    unittest.main()